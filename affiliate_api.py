@@ -1,14 +1,16 @@
 import os
-import requests
-import hashlib
-import hmac
 import json
 import logging
 import traceback
 from datetime import datetime
 
-import gspread
-from google.oauth2.service_account import Credentials
+
+from sheets_client import get_worksheet
+from sheet_writer import BatchedSheetWriter
+from sheet_index import get_result_index
+from sheet_partition import read_date_block
+from affiliate_enrichment import enrich_products
+from aliexpress_affiliate import get_product_details, generate_affiliate_links
 
 # OpenAI 사용 시 (필요하면)
 import openai
@@ -25,27 +27,13 @@ READ_SHEET_NAME = 'list'       # 시트: [date, keyword]
 RESULT_SHEET_NAME = 'result'   # 시트: [date, keyword, product_id, product_title, target_sale_price, affiliate_link]
 
 # API 호출에 사용할 AliExpress Affiliate API 파라미터 (환경 변수로 Secrets 관리)
-# ALIEXPRESS_ACCESS_TOKEN, ALIEXPRESS_API_KEY, ALIEXPRESS_API_SECRET 등
-
-# --- 서명 생성 함수 ---
-def generate_signature(params, app_secret):
-    sorted_params = sorted(params.items())
-    canonicalized_query_string = ''
-    for k, v in sorted_params:
-        canonicalized_query_string += f"{k}{v}"
-    sign = hmac.new(app_secret.encode('utf-8'),
-                    canonicalized_query_string.encode('utf-8'),
-                    hashlib.sha256).hexdigest().upper()
-    return sign
+# ALIEXPRESS_ACCESS_TOKEN, ALIEXPRESS_API_KEY, ALIEXPRESS_API_SECRET 등 (서명/호출은 aliexpress_affiliate.py)
 
 # --- Google Sheet 관련 함수 ---
 def connect_to_google_sheet(sheet_name):
     logging.info("Google Sheet 연결 시도...")
     try:
-        scopes = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        creds = Credentials.from_service_account_file(JSON_KEY_PATH, scopes=scopes)
-        client = gspread.authorize(creds)
-        sheet = client.open_by_key(SHEET_ID).worksheet(sheet_name)
+        sheet = get_worksheet(sheet_name, SHEET_ID, JSON_KEY_PATH)
         logging.info(f'Google Sheet "{sheet_name}" 연결 성공')
         return sheet
     except Exception as e:
@@ -56,9 +44,8 @@ def connect_to_google_sheet(sheet_name):
 def get_today_keywords():
     try:
         sheet = connect_to_google_sheet(READ_SHEET_NAME)
-        data = sheet.get_all_records()
         today = datetime.today().strftime('%Y-%m-%d')
-        keywords = [row['keyword'] for row in data if str(row.get('date', '')) == today]
+        keywords = [row['keyword'] for _, row in read_date_block(sheet, today)]  # 오늘 날짜 행만 조회
         logging.info(f"오늘 날짜({today}) 키워드 수집 완료: {keywords}")
         return keywords
     except Exception as e:
@@ -69,11 +56,10 @@ def get_today_keywords():
 def get_existing_product_ids(keyword):
     try:
         sheet = connect_to_google_sheet(RESULT_SHEET_NAME)
-        records = sheet.get_all_records()
         today = datetime.today().strftime('%Y-%m-%d')
+        index = get_result_index(sheet, today)  # 실행당 한 번만 오늘 날짜 블록을 읽고 이후에는 메모리 색인 조회
         # 결과 시트에 오늘 날짜와 해당 키워드에 대해 저장된 product_id 목록 추출
-        product_ids = [str(row["product_id"]) for row in records 
-                       if str(row.get("date", '')) == today and row.get("keyword", "").strip() == keyword and row.get("product_id")]
+        product_ids = index.product_ids(today, keyword)
         logging.info(f"[{keyword}] 구글 시트에 이미 저장된 상품 ID 수: {len(product_ids)}")
         return product_ids
     except Exception as e:
@@ -82,14 +68,12 @@ def get_existing_product_ids(keyword):
         return []
 
 def save_results_to_sheet(results):
-    # Google Sheets API 클라이언트 설정
-    gc = gspread.service_account(filename=os.getenv("JSON_KEY_PATH"))
-    sheet = gc.open_by_key(os.getenv("SHEET_ID")).sheet1
+    sheet = connect_to_google_sheet(RESULT_SHEET_NAME)
 
-    # 기존 데이터 가져오기
-    existing_data = sheet.get_all_records()
-    existing_ids = {row['product_id']: index + 2 for index, row in enumerate(existing_data)}  # 1-based index
+    # 기존 데이터 가져오기 (get_existing_product_ids에서 만든 스냅샷 색인 재사용)
+    index = get_result_index(sheet, datetime.today().strftime('%Y-%m-%d'))
 
+    writer = BatchedSheetWriter(sheet)
     for result in results:
         today, keyword, product_id, product_title, target_sale_price, affiliate_link, discount_price, discount_rate, average_rating, sales_volume, product_main_image_url = result
         
@@ -105,75 +89,49 @@ def save_results_to_sheet(results):
             "product_main_image_url": product_main_image_url
         }
         
+        details_json = json.dumps(details, ensure_ascii=False)
+        row_index = index.row_of(product_id)
+        if row_index is None:
+            # 오늘 날짜 블록에 행이 없는 상품(예시 상품 ID 등)은 시트에 쓰지 않음
+            logging.warning(f"[{product_id}] 오늘 결과 시트에 행이 없어 details 업데이트를 건너뜁니다.")
+            continue
+
         # G열에 details JSON 입력
-        row_index = existing_ids[product_id]  # product_id가 항상 존재하므로 직접 접근
-        sheet.update_cell(row_index, 7, json.dumps(details, ensure_ascii=False))  # G열은 7번째 열
+        writer.update_cell(row_index, 7, details_json)  # G열은 7번째 열
         logging.info(f"[{product_id}] G열에 details 정보 업데이트: {details}")
+    writer.flush()
 
 # --- AliExpress Affiliate API 함수 --- 
-def get_product_detail_api(product_id):
-    params = {
-        "access_token": os.getenv("ALIEXPRESS_ACCESS_TOKEN"),
-        "app_key": os.getenv("ALIEXPRESS_API_KEY"),
-        "product_id": product_id,
-        "countryCode": "KR",
-        "currency": "KRW",
-        "fields": "product_id,product_title,target_sale_price,discount_price,discount_rate,average_rating,sales_volume,product_main_image_url,detail_url",
-        "local": "ko_KR",
-        "method": "aliexpress.affiliate.productdetail.get",
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        "sign_method": "hmac-sha256"
-    }
-    params["sign"] = generate_signature(params, os.getenv("ALIEXPRESS_API_SECRET"))
-    logging.info(f"[{product_id}] 요청 파라미터 (productdetail): {json.dumps(params, indent=2, ensure_ascii=False)}")
-    
-    response = requests.get("https://api-sg.aliexpress.com/sync", params=params)
-    logging.info(f"[{product_id}] productdetail 응답 코드: {response.status_code}")
-    response.raise_for_status()
-    
-    data = response.json()
-    detail = data.get("aliexpress_affiliate_productdetail_get_response", {}).get("result", {})
-    
-    # 필요한 정보 추출
-    product_info = {
-        "product_id": detail.get("product_id"),
-        "product_title": detail.get("product_title"),
-        "target_sale_price": detail.get("target_sale_price"),
-        "discount_price": detail.get("discount_price"),
-        "discount_rate": detail.get("discount_rate"),
-        "average_rating": detail.get("average_rating"),
-        "sales_volume": detail.get("sales_volume"),
-        "product_main_image_url": detail.get("product_main_image_url"),
-        "detail_url": detail.get("detail_url")
-    }
-    
-    logging.info(f"[{product_id}] 상품 상세 정보: {json.dumps(product_info, indent=2, ensure_ascii=False)}")
-    return product_info
-
-
-
-def generate_affiliate_link_api(product_id):
-    params = {
-        "access_token": os.getenv("ALIEXPRESS_ACCESS_TOKEN"),
-        "app_key": os.getenv("ALIEXPRESS_API_KEY"),
-        "product_id": product_id,
-        "local": "ko_KR",
-        "method": "aliexpress.affiliate.link.generate",
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        "sign_method": "hmac-sha256"
-    }
-    params["sign"] = generate_signature(params, os.getenv("ALIEXPRESS_API_SECRET"))
-    logging.info(f"[{product_id}] 요청 파라미터 (link.generate): {json.dumps(params, indent=2, ensure_ascii=False)}")
-    
-    response = requests.get("https://api-sg.aliexpress.com/sync", params=params)
-    logging.info(f"[{product_id}] link.generate 응답 코드: {response.status_code}")
-    response.raise_for_status()
-    
-    data = response.json()
-    link = data.get("aliexpress_affiliate_link_generate_response", {}).get("result", {})
-    
-    logging.info(f"[{product_id}] 제휴 링크 정보: {json.dumps(link, indent=2, ensure_ascii=False)}")
-    return link
+DETAIL_FIELDS = "product_id,product_title,target_sale_price,discount_price,discount_rate,average_rating,sales_volume,product_main_image_url,detail_url"
+
+def get_product_details_api(product_ids):
+    """상품 ID 목록의 상세 정보를 productdetail.get 묶음 요청(최대 20개씩)으로 가져와 {상품 ID: 상세 정보}로 반환합니다."""
+    product_infos = {}
+    for product_id, detail in get_product_details(product_ids, DETAIL_FIELDS).items():
+        # 필요한 정보 추출
+        product_info = {
+            "product_id": detail.get("product_id"),
+            "product_title": detail.get("product_title"),
+            "target_sale_price": detail.get("target_sale_price"),
+            "discount_price": detail.get("discount_price"),
+            "discount_rate": detail.get("discount_rate"),
+            "average_rating": detail.get("average_rating"),
+            "sales_volume": detail.get("sales_volume"),
+            "product_main_image_url": detail.get("product_main_image_url"),
+            "detail_url": detail.get("detail_url")
+        }
+        logging.info(f"[{product_id}] 상품 상세 정보: {json.dumps(product_info, indent=2, ensure_ascii=False)}")
+        product_infos[product_id] = product_info
+    return product_infos
+
+
+
+def generate_affiliate_links_api(product_ids):
+    """link.generate 묶음 요청으로 제휴 링크를 만들어 {상품 ID: {"promotion_link": 링크}}로 반환합니다 (캐시 사용)."""
+    links = generate_affiliate_links(product_ids)
+    for product_id, link in links.items():
+        logging.info(f"[{product_id}] 제휴 링크: {link}")
+    return {product_id: {"promotion_link": link} for product_id, link in links.items()}
 
 
 
@@ -188,37 +146,47 @@ def main():
     results = []
     today = datetime.today().strftime('%Y-%m-%d')
     
+    # 1단계: 키워드별 처리할 상품 ID 목록 정리
+    pids_by_keyword = {}
     for keyword in keywords:
         logging.info(f"[PROCESS] '{keyword}' 작업 시작")
         existing_ids = get_existing_product_ids(keyword)
         
         if not existing_ids:
             logging.info(f"[{keyword}] 기존 결과 없음, 임의의 상품 ID 사용 (예시)")
-            pids = ["1005008742459910", "1005005120738913", "1005006955548562", "1005006388837801", "1005005967496979"]
+            pids_by_keyword[keyword] = ["1005008742459910", "1005005120738913", "1005006955548562", "1005006388837801", "1005005967496979"]
         else:
-            pids = existing_ids[:5]
-            logging.info(f"[{keyword}] 기존 상품 ID 사용: {pids}")
-        
+            pids_by_keyword[keyword] = existing_ids[:5]
+            logging.info(f"[{keyword}] 기존 상품 ID 사용: {pids_by_keyword[keyword]}")
+
+    # 2단계: 전체 상품의 상세 정보 + 제휴 링크를 동시에 요청
+    enriched = enrich_products([pid for pids in pids_by_keyword.values() for pid in pids],
+                               get_product_details_api, generate_affiliate_links_api)
+
+    # 3단계: 상품 ID 기준으로 결과 병합
+    for keyword, pids in pids_by_keyword.items():
         for pid in pids:
-            try:
-                detail = get_product_detail_api(pid)
-                affiliate_link = generate_affiliate_link_api(pid)
-                
-                # 최종 결과에 날짜, 키워드, 상품ID, 제품명, 판매가, 제휴 링크 저장
-                results.append([
-                    today,
-                    keyword,
-                    detail.get("product_id"),
-                    detail.get("product_title"),
-                    detail.get("target_sale_price"),
-                    affiliate_link.get("promotion_link", "")
-                ])
-            except Exception as e:
-                logging.error(f"[{pid}] 상품 정보 처리 중 오류 발생: {e}")
-                traceback.print_exc()
-        
-        logging.info(f"[{keyword}] 작업 종료, 2초 대기")
-        time.sleep(2)
+            detail = enriched[str(pid)]['detail']
+            affiliate_link = enriched[str(pid)]['link']
+            if detail is None or affiliate_link is None:
+                logging.warning(f"[{pid}] 상품 정보 요청 실패로 제외합니다.")
+                continue
+
+            # 최종 결과: 날짜, 키워드, 상품ID, 제품명, 판매가, 제휴 링크, 할인가, 할인율, 평점, 판매량, 대표 이미지
+            results.append([
+                today,
+                keyword,
+                detail.get("product_id") or pid,
+                detail.get("product_title"),
+                detail.get("target_sale_price"),
+                affiliate_link.get("promotion_link", ""),
+                detail.get("discount_price"),
+                detail.get("discount_rate"),
+                detail.get("average_rating"),
+                detail.get("sales_volume"),
+                detail.get("product_main_image_url")
+            ])
+        logging.info(f"[{keyword}] 작업 종료")
     
     if results:
         save_results_to_sheet(results)
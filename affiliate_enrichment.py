@@ -0,0 +1,42 @@
+import os
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from aliexpress_affiliate import DETAIL_BATCH_SIZE, LINK_BATCH_SIZE, _chunks
+
+# 상품 상세/제휴 링크 요청을 동시에 보낼 최대 작업 수 (호출 속도는 rate_limiter의 ALIEXPRESS_QPS로 제한)
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "8"))
+
+
+def _call(func, arg, label):
+    try:
+        return func(arg)
+    except Exception as e:
+        logging.error(f"[{arg}] {label} 요청 실패: {e}")
+        traceback.print_exc()
+        return None
+
+
+def enrich_products(product_ids, get_details, get_links, concurrency=ENRICH_CONCURRENCY,
+                    detail_batch_size=DETAIL_BATCH_SIZE, link_batch_size=LINK_BATCH_SIZE):
+    """모든 상품의 상세 정보와 제휴 링크를 묶음 단위로 나눠 제한된 스레드 풀에서 동시에 요청합니다.
+
+    get_details / get_links는 상품 ID 목록을 받아 {상품 ID: 정보}를 반환합니다.
+    {상품 ID: {'detail': 상세 정보, 'link': 링크 정보}}를 반환하며, 받지 못한 정보는 None으로 채웁니다.
+    """
+    product_ids = list(dict.fromkeys(str(product_id) for product_id in product_ids))
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        detail_futures = [executor.submit(_call, get_details, chunk, "상품 상세")
+                          for chunk in _chunks(product_ids, detail_batch_size)]
+        link_futures = [executor.submit(_call, get_links, chunk, "제휴 링크")
+                        for chunk in _chunks(product_ids, link_batch_size)]
+        details, links = {}, {}
+        for future in detail_futures:
+            details.update(future.result() or {})
+        for future in link_futures:
+            links.update(future.result() or {})
+    enriched = {product_id: {'detail': details.get(product_id), 'link': links.get(product_id)}
+                for product_id in product_ids}
+    logging.info(f"상품 정보 동시 수집 완료: {len(enriched)}개 상품")
+    return enriched
@@ -0,0 +1,182 @@
+import os
+import re
+import hmac
+import hashlib
+import logging
+from datetime import datetime
+
+from http_session import get_session
+from rate_limiter import get_limiter
+from link_cache import get_link_cache
+from product_catalog import get_product_catalog
+
+SYNC_URL = "https://api-sg.aliexpress.com/sync"
+
+# productdetail.get 한 번에 묻는 상품 수 (API 최대 20개) / 실패한 상품 ID만 하나씩 다시 묻는 횟수
+DETAIL_BATCH_SIZE = min(20, int(os.getenv("ALIEXPRESS_DETAIL_BATCH_SIZE", "20")))
+DETAIL_RETRIES = int(os.getenv("ALIEXPRESS_DETAIL_RETRIES", "1"))
+# link.generate 한 번에 보내는 상품 URL 수 (API 최대 50개) / 실패한 상품만 하나씩 다시 요청하는 횟수 / 제휴 링크 추적 ID
+LINK_BATCH_SIZE = min(50, int(os.getenv("ALIEXPRESS_LINK_BATCH_SIZE", "50")))
+LINK_RETRIES = int(os.getenv("ALIEXPRESS_LINK_RETRIES", "1"))
+TRACKING_ID = os.getenv("ALIEXPRESS_TRACKING_ID", "default")
+ITEM_URL = "https://www.aliexpress.com/item/{product_id}.html"
+
+
+def generate_signature(params, app_secret):
+    canonicalized_query_string = ''.join(f"{k}{v}" for k, v in sorted(params.items()))
+    return hmac.new(app_secret.encode('utf-8'),
+                    canonicalized_query_string.encode('utf-8'),
+                    hashlib.sha256).hexdigest().upper()
+
+
+def call_sync(method, params):
+    """제휴 API(/sync)를 서명해서 호출하고 응답 JSON의 '<method>_response' 부분을 반환합니다."""
+    params = dict(params)
+    params.update({
+        "access_token": os.getenv("ALIEXPRESS_ACCESS_TOKEN"),
+        "app_key": os.getenv("ALIEXPRESS_API_KEY"),
+        "method": method,
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        "sign_method": "hmac-sha256"
+    })
+    params["sign"] = generate_signature(params, os.getenv("ALIEXPRESS_API_SECRET"))
+    get_limiter('aliexpress').acquire()  # 제휴 API 호출 속도 제한
+    response = get_session().get(SYNC_URL, params=params)
+    response.raise_for_status()
+    data = response.json()
+    if 'error_response' in data:
+        raise RuntimeError(f"{method} 오류 응답: {data['error_response']}")
+    return data.get(method.replace('.', '_') + '_response', {})
+
+
+def response_items(body, list_key='products', item_key='product'):
+    """응답의 상품 목록을 꺼냅니다.
+
+    resp_result.result.products.product(목록) 형태와, 상품 하나가 result에 바로 들어 있는 형태를 모두 처리합니다.
+    """
+    result = (body.get('resp_result') or {}).get('result') or body.get('result') or {}
+    items = (result.get(list_key) or {}).get(item_key) if isinstance(result, dict) else None
+    if items is None:
+        items = [result] if isinstance(result, dict) and result else []
+    return items if isinstance(items, list) else [items]
+
+
+def _chunks(items, size):
+    size = max(1, int(size))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _fetch_product_details(product_ids, fields, batch_size=DETAIL_BATCH_SIZE, retries=DETAIL_RETRIES):
+    """productdetail.get을 상품 ID batch_size개씩 묶어 호출하고 {상품 ID: 상세 정보}를 반환합니다.
+
+    응답에 빠졌거나 요청이 실패한 상품 ID만 retries번까지 하나씩 따로 다시 요청합니다
+    (묶음 안의 문제 상품 하나 때문에 나머지가 다시 실패하지 않도록). 끝까지 못 받은 상품은 결과에 없습니다.
+    """
+    pending = list(dict.fromkeys(str(product_id) for product_id in product_ids))
+    details = {}
+    for attempt in range(retries + 1):
+        failed = []
+        for chunk in _chunks(pending, batch_size if attempt == 0 else 1):
+            try:
+                body = call_sync("aliexpress.affiliate.productdetail.get", {
+                    "product_ids": ",".join(chunk),
+                    "countryCode": "KR",
+                    "currency": "KRW",
+                    "fields": fields,
+                    "local": "ko_KR",
+                })
+                for item in response_items(body):
+                    if str(item.get('product_id')) in chunk:
+                        details[str(item['product_id'])] = item
+            except Exception as e:
+                logging.error(f"productdetail 요청 실패 ({len(chunk)}개 상품): {e}")
+            failed += [product_id for product_id in chunk if product_id not in details]
+        if not failed:
+            break
+        if attempt < retries:
+            logging.warning(f"상세 정보를 받지 못한 상품 {len(failed)}개 재요청: {failed}")
+        pending = failed
+    logging.info(f"productdetail 완료: {len(details)}/{len(set(map(str, product_ids)))}개 상품")
+    return details
+
+
+def get_product_details(product_ids, fields, batch_size=DETAIL_BATCH_SIZE, retries=DETAIL_RETRIES, use_catalog=True):
+    """상품 상세 정보를 {상품 ID: 상세 정보}로 반환합니다.
+
+    로컬 상품 카탈로그에서 필드 그룹별 TTL이 지나지 않은 값은 그대로 쓰고, 오래되었거나 없는 필드만
+    fields 파라미터로 요청합니다 (같은 필드 조합이 필요한 상품끼리 묶어서 요청).
+    """
+    if not use_catalog:
+        return _fetch_product_details(product_ids, fields, batch_size, retries)
+
+    product_ids = list(dict.fromkeys(str(product_id) for product_id in product_ids))
+    field_list = [field.strip() for field in fields.split(',') if field.strip()]
+    catalog = get_product_catalog()
+    details, stale = catalog.lookup(product_ids, field_list)
+
+    groups = {}
+    for product_id, missing in stale.items():
+        groups.setdefault(tuple(missing), []).append(product_id)
+    for missing, group_ids in groups.items():
+        request_fields = list(dict.fromkeys(('product_id',) + missing))
+        fetched = _fetch_product_details(group_ids, ",".join(request_fields), batch_size, retries)
+        # 응답에 없는 필드도 None으로 저장해 다음 실행에서 계속 다시 묻지 않도록 함
+        fetched = {product_id: {field: item.get(field) for field in request_fields} for product_id, item in fetched.items()}
+        catalog.put(fetched)
+        for product_id, item in fetched.items():
+            details[product_id].update(item)
+        for product_id in group_ids:
+            if product_id not in fetched:
+                details.pop(product_id, None)  # 요청 실패한 상품은 결과에서 제외
+
+    logging.info(f"상품 카탈로그: {len(product_ids)}개 중 {len(stale)}개 상품 갱신 요청 (필드 조합 {len(groups)}종)")
+    # 응답에 없던 필드(None)는 API 응답과 같이 키를 빼고 반환
+    return {product_id: {field: value for field, value in detail.items() if value is not None}
+            for product_id, detail in details.items()}
+
+
+def _product_id_from_url(url):
+    match = re.search(r'/item/(\d+)\.html', url or '')
+    return match.group(1) if match else None
+
+
+def generate_affiliate_links(product_ids, tracking_id=TRACKING_ID, batch_size=LINK_BATCH_SIZE, retries=LINK_RETRIES,
+                             use_cache=True):
+    """상품 URL을 batch_size개씩 source_values로 묶어 link.generate를 호출하고 {상품 ID: promotion_link}를 반환합니다.
+
+    (상품 ID, tracking_id)별 링크는 로컬 캐시에서 먼저 찾고, 링크를 받지 못한 상품 ID만 retries번까지 하나씩 따로 다시 요청합니다.
+    """
+    product_ids = list(dict.fromkeys(str(product_id) for product_id in product_ids))
+    cache = get_link_cache() if use_cache else None
+    links = cache.get_many(product_ids, tracking_id) if cache else {}
+    pending = [product_id for product_id in product_ids if product_id not in links]
+    if links:
+        logging.info(f"제휴 링크 캐시 사용: {len(links)}개 상품")
+
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        created = {}
+        for chunk in _chunks(pending, batch_size if attempt == 0 else 1):
+            try:
+                body = call_sync("aliexpress.affiliate.link.generate", {
+                    "promotion_link_type": 0,
+                    "source_values": ",".join(ITEM_URL.format(product_id=product_id) for product_id in chunk),
+                    "tracking_id": tracking_id,
+                })
+                for item in response_items(body, 'promotion_links', 'promotion_link'):
+                    product_id = _product_id_from_url(item.get('source_value'))
+                    if product_id in chunk and item.get('promotion_link'):
+                        created[product_id] = item['promotion_link']
+            except Exception as e:
+                logging.error(f"link.generate 요청 실패 ({len(chunk)}개 상품): {e}")
+        if cache and created:
+            cache.put_many(created, tracking_id)
+        links.update(created)
+        pending = [product_id for product_id in pending if product_id not in created]
+        if pending and attempt < retries:
+            logging.warning(f"제휴 링크를 받지 못한 상품 {len(pending)}개 재요청: {pending}")
+
+    if pending:
+        logging.error(f"제휴 링크 생성 실패: {pending}")
+    return links
@@ -1,7 +1,4 @@
 import os
-import requests
-import hashlib
-import hmac
 import json
 import logging
 import traceback
@@ -12,6 +9,11 @@ from google.oauth2.service_account import Credentials
 import openai
 import base64
 
+from sheet_writer import BatchedSheetWriter
+from http_session import get_session
+from affiliate_enrichment import enrich_products
+from aliexpress_affiliate import get_product_details, generate_affiliate_links
+
 
 
 # GitHub Secrets에서 API 키 가져오기
@@ -42,7 +44,7 @@ def get_google_creds():
         'Authorization': f'Bearer {access_token}',
     }
 
-    response = requests.get('https://sheets.googleapis.com/v4/spreadsheets/1Ew7u6N72VP3nVvgNiLKZDyIpHg4xXz-prkyV4SW7EkI', headers=headers)
+    response = get_session().get('https://sheets.googleapis.com/v4/spreadsheets/1Ew7u6N72VP3nVvgNiLKZDyIpHg4xXz-prkyV4SW7EkI', headers=headers)
     print(response.json())
     
     return creds
@@ -74,61 +76,24 @@ def save_results_to_sheet(results):
     try:
         sheet = connect_to_google_sheet(RESULT_SHEET_NAME)
         sheet.clear()
-        sheet.append_row(['date', 'keyword', 'product_id', 'product_info'])
-        for row in results:
-            sheet.append_row(row)
+        with BatchedSheetWriter(sheet) as writer:
+            writer.append_row(['date', 'keyword', 'product_id', 'product_info'])
+            writer.append_rows(results)
         logging.info(f"구글 시트에 결과 저장 완료: https://docs.google.com/spreadsheets/d/{SHEET_ID}/edit")
     except Exception as e:
         logging.error(f"결과 저장 실패: {e}")
         traceback.print_exc()
 
-# AliExpress API 함수
-def generate_signature(params, app_secret):
-    sorted_params = sorted(params.items())
-    canonicalized_query_string = ''.join(f"{k}{v}" for k, v in sorted_params)
-    sign = hmac.new(
-        app_secret.encode('utf-8'),
-        canonicalized_query_string.encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest().upper()
-    return sign
-
-def get_product_detail(product_id):
-    params = {
-        "access_token": ALIEXPRESS_ACCESS_TOKEN,
-        "app_key": ALIEXPRESS_API_KEY,
-        "product_id": product_id,
-        "countryCode": "KR",
-        "currency": "KRW",
-        "fields": "product_id,product_title,target_sale_price,detail_url,evaluate_rate,total_sales_volume,product_main_image_url",
-        "local": "ko_KR",
-        "method": "aliexpress.affiliate.productdetail.get",
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        "sign_method": "hmac-sha256"
-    }
-    params["sign"] = generate_signature(params, ALIEXPRESS_API_SECRET)
-    response = requests.get("https://api-sg.aliexpress.com/sync", params=params)
-    response.raise_for_status()
-    data = response.json()
-    detail = data.get("aliexpress_affiliate_productdetail_get_response", {}).get("result", {})
-    return detail
-
-def generate_affiliate_link(product_id):
-    params = {
-        "access_token": ALIEXPRESS_ACCESS_TOKEN,
-        "app_key": ALIEXPRESS_API_KEY,
-        "product_id": product_id,
-        "local": "ko_KR",
-        "method": "aliexpress.affiliate.link.generate",
-        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-        "sign_method": "hmac-sha256"
-    }
-    params["sign"] = generate_signature(params, ALIEXPRESS_API_SECRET)
-    response = requests.get("https://api-sg.aliexpress.com/sync", params=params)
-    response.raise_for_status()
-    data = response.json()
-    link_result = data.get("aliexpress_affiliate_link_generate_response", {}).get("result", {})
-    return link_result
+# AliExpress API 함수 (서명/호출은 aliexpress_affiliate.py)
+DETAIL_FIELDS = "product_id,product_title,target_sale_price,detail_url,evaluate_rate,total_sales_volume,product_main_image_url"
+
+def get_product_details_batch(product_ids):
+    """productdetail.get을 최대 20개씩 묶어 호출하고 {상품 ID: 상세 정보}를 반환합니다."""
+    return get_product_details(product_ids, DETAIL_FIELDS)
+
+def generate_affiliate_links_batch(product_ids):
+    """source_values 묶음 요청으로 {상품 ID: {"promotion_link": 링크}}를 반환합니다 (캐시 사용)."""
+    return {product_id: {"promotion_link": link} for product_id, link in generate_affiliate_links(product_ids).items()}
 
 # Main orchestration
 def main():
@@ -140,27 +105,28 @@ def main():
 
     updated_results = []
     today = datetime.today().strftime('%Y-%m-%d')
+    # 전체 상품의 상세 정보 + 제휴 링크를 동시에 요청한 뒤 상품 ID 기준으로 병합
+    enriched = enrich_products([record.get("product_id") for record in rows], get_product_details_batch, generate_affiliate_links_batch)
     for record in rows:
         product_id = str(record.get("product_id"))
         keyword = record.get("keyword", "")
-        try:
-            detail = get_product_detail(product_id)
-            affiliate_data = generate_affiliate_link(product_id)
-            product_info = {
-                "product_title": detail.get("product_title", ""),
-                "target_sale_price": detail.get("target_sale_price", ""),
-                "detail_url": detail.get("detail_url", ""),
-                "evaluate_rate": detail.get("evaluate_rate", ""),
-                "total_sales_volume": detail.get("total_sales_volume", ""),
-                "product_main_image_url": detail.get("product_main_image_url", ""),
-                "affiliate_link": affiliate_data.get("promotion_link", "")
-            }
-            product_info_json = json.dumps(product_info, ensure_ascii=False)
-            updated_results.append([today, keyword, product_id, product_info_json])
-            logging.info(f"[{product_id}] 최종 결과: {product_info_json}")
-        except Exception as e:
-            logging.error(f"[{product_id}] 처리 중 오류: {e}")
-            traceback.print_exc()
+        detail = enriched[product_id]['detail']
+        affiliate_data = enriched[product_id]['link']
+        if detail is None or affiliate_data is None:
+            logging.warning(f"[{product_id}] 상품 정보 요청 실패로 제외합니다.")
+            continue
+        product_info = {
+            "product_title": detail.get("product_title", ""),
+            "target_sale_price": detail.get("target_sale_price", ""),
+            "detail_url": detail.get("detail_url", ""),
+            "evaluate_rate": detail.get("evaluate_rate", ""),
+            "total_sales_volume": detail.get("total_sales_volume", ""),
+            "product_main_image_url": detail.get("product_main_image_url", ""),
+            "affiliate_link": affiliate_data.get("promotion_link", "")
+        }
+        product_info_json = json.dumps(product_info, ensure_ascii=False)
+        updated_results.append([today, keyword, product_id, product_info_json])
+        logging.info(f"[{product_id}] 최종 결과: {product_info_json}")
     if updated_results:
         save_results_to_sheet(updated_results)
     else:
@@ -18,6 +18,9 @@ import os
 from os.path import expanduser
 import socket
 import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # dir = os.getenv('HOME')
 dir = expanduser("~")
@@ -83,6 +86,10 @@ def mixStr(pstr):
     else:
         return str(pstr)
 
+def buildFullUrl(api_url, parameters):
+    # only used for logging, so it is built when a log line is actually written
+    return api_url + "?" + "&".join(key + "=" + str(parameters[key]) for key in parameters)
+
 def logApiError(appkey, sdkVersion, requestUrl, code, message):
     localIp = socket.gethostbyname(socket.gethostname())
     platformType = platform.platform()
@@ -127,11 +134,37 @@ class IopResponse(object):
 class IopClient(object):
     
     log_level = P_LOG_LEVEL_ERROR
-    def __init__(self, server_url,app_key,app_secret,timeout=30):
+    def __init__(self, server_url,app_key,app_secret,timeout=30,pooled=False,pool_maxsize=10,max_workers=8):
+        #===========================================================================
+        # @param pooled       reuse keep-alive connections through one shared requests.Session
+        # @param pool_maxsize max connections kept open to the gateway (pooled mode)
+        # @param max_workers  default number of threads used by execute_many
+        #===========================================================================
         self._server_url = server_url
         self._app_key = app_key
         self._app_secret = app_secret
         self._timeout = timeout
+        self._max_workers = max_workers
+        self._session = None
+        self._session_lock = threading.Lock()
+        if(pooled):
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+
+    def close(self):
+        with self._session_lock:
+            if(self._session is not None):
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
     
     def execute(self, request,access_token = None):
 
@@ -160,18 +193,16 @@ class IopClient(object):
 
         api_url = self._server_url
 
-        full_url = api_url + "?";
-        for key in sign_parameter:
-            full_url += key + "=" + str(sign_parameter[key]) + "&";
-        full_url = full_url[0:-1]
+        # pooled mode shares one session (and its connection pool) across threads
+        http = self._session if self._session is not None else requests
 
         try:
             if(request._http_method == 'POST' or len(request._file_params) != 0) :
-                r = requests.post(api_url,sign_parameter,files=request._file_params, timeout=self._timeout)
+                r = http.post(api_url,sign_parameter,files=request._file_params, timeout=self._timeout)
             else:
-                r = requests.get(api_url,sign_parameter, timeout=self._timeout)
+                r = http.get(api_url,sign_parameter, timeout=self._timeout)
         except Exception as err:
-            logApiError(self._app_key, P_SDK_VERSION, full_url, "HTTP_ERROR", str(err))
+            logApiError(self._app_key, P_SDK_VERSION, buildFullUrl(api_url, sign_parameter), "HTTP_ERROR", str(err))
             raise err
 
         response = IopResponse()
@@ -188,11 +219,30 @@ class IopClient(object):
             response.request_id = jsonobj[P_REQUEST_ID]
 
         if response.code is not None and response.code != "0":
-            logApiError(self._app_key, P_SDK_VERSION, full_url, response.code, response.message)
+            logApiError(self._app_key, P_SDK_VERSION, buildFullUrl(api_url, sign_parameter), response.code, response.message)
         else:
             if(self.log_level == P_LOG_LEVEL_DEBUG or self.log_level == P_LOG_LEVEL_INFO):
-                logApiError(self._app_key, P_SDK_VERSION, full_url, "", "")
+                logApiError(self._app_key, P_SDK_VERSION, buildFullUrl(api_url, sign_parameter), "", "")
 
         response.body = jsonobj
 
         return response
+
+    def execute_many(self, requests_list, access_token = None, max_workers = None, return_exceptions = False):
+        #===========================================================================
+        # run several IopRequest concurrently and return the IopResponse list in the same order
+        # @param return_exceptions  put the raised exception in place of the response instead of raising it
+        #===========================================================================
+        def run(request):
+            try:
+                return self.execute(request, access_token)
+            except Exception as err:
+                if(return_exceptions):
+                    return err
+                raise
+
+        if(len(requests_list) == 0):
+            return []
+        workers = min(max_workers or self._max_workers, len(requests_list))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, requests_list))
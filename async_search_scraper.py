@@ -0,0 +1,114 @@
+import os
+import time
+import asyncio
+import logging
+import traceback
+
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from search_scraper import (SEARCH_URL, PRODUCT_LINK_SELECTOR, PRODUCT_LIMIT, PRODUCT_WAIT_TIMEOUT_MS,
+                            SCROLL_SETTLE_TIMEOUT_MS, COUNT_GREW_JS, COUNT_JS, EXTRACT_PRODUCTS_JS,
+                            CAPTURE_MODE, JSON_CAPTURE_TIMEOUT_MS, is_search_response, parse_search_payload)
+from resource_blocking import install_resource_blocking_async
+from rate_limiter import get_limiter
+
+# 동시에 처리할 키워드 수 (페이지 요청 속도는 rate_limiter의 SEARCH_RPM으로 제한)
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+
+
+async def wait_for_products(page, target, timeout_ms=PRODUCT_WAIT_TIMEOUT_MS):
+    """search_scraper.wait_for_products의 비동기 버전입니다."""
+    deadline = time.monotonic() + timeout_ms / 1000
+    try:
+        await page.wait_for_selector(PRODUCT_LINK_SELECTOR, state='attached', timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        return 0
+
+    count = await page.eval_on_selector_all(PRODUCT_LINK_SELECTOR, COUNT_JS)
+    while count < target:
+        remaining_ms = (deadline - time.monotonic()) * 1000
+        if remaining_ms <= 0:
+            break
+        await page.evaluate('window.scrollBy(0, window.innerHeight);')
+        try:
+            await page.wait_for_function(COUNT_GREW_JS, arg=[PRODUCT_LINK_SELECTOR, count],
+                                         timeout=min(SCROLL_SETTLE_TIMEOUT_MS, remaining_ms))
+        except PlaywrightTimeoutError:
+            break
+        count = await page.eval_on_selector_all(PRODUCT_LINK_SELECTOR, COUNT_JS)
+    return count
+
+
+async def _capture_search_json(page, url, keyword):
+    """search_scraper._capture_search_json의 비동기 버전입니다."""
+    try:
+        async with page.expect_response(is_search_response, timeout=JSON_CAPTURE_TIMEOUT_MS) as response_info:
+            await page.goto(url, wait_until='domcontentloaded')
+        response = await response_info.value
+        return await response.json()
+    except PlaywrightTimeoutError:
+        logging.info(f"[{keyword}] 검색 JSON 응답을 받지 못해 DOM 추출로 대체합니다.")
+    except ValueError:
+        logging.warning(f"[{keyword}] 검색 JSON 파싱 오류, DOM 추출로 대체합니다.")
+    except PlaywrightError as e:
+        # 응답 본문을 읽을 수 없는 경우 등 (예: "body unavailable")
+        logging.warning(f"[{keyword}] 검색 JSON 응답 읽기 실패 ({e}), DOM 추출로 대체합니다.")
+    return None
+
+
+async def _scrape_keyword(browser, keyword, semaphore, block_resources, limit, mode):
+    product_data = []  # (상품 ID, 상품 제목) 튜플을 저장할 리스트
+
+    if not keyword:
+        logging.warning("검색어가 비어 있습니다. 건너뜁니다.")
+        return product_data
+
+    async with semaphore:
+        context = await browser.new_context(locale='ko-KR')
+        try:
+            if block_resources:
+                await install_resource_blocking_async(context)
+            page = await context.new_page()
+            url = SEARCH_URL.format(keyword=keyword)
+            await get_limiter('search').acquire_async()  # 동기 크롤러와 같은 검색 페이지 토큰 버킷 사용
+            products = []
+            if mode == 'json':
+                payload = await _capture_search_json(page, url, keyword)
+                products = parse_search_payload(payload, limit) if payload is not None else []
+            else:
+                await page.goto(url, wait_until='domcontentloaded')
+            logging.info(f"[{keyword}] 페이지 로딩 완료")
+
+            if not products:
+                await wait_for_products(page, limit)
+                products = await page.eval_on_selector_all(PRODUCT_LINK_SELECTOR, EXTRACT_PRODUCTS_JS, limit)
+            for product in products:
+                product_data.append((product['id'], product['title']))
+                logging.info(f"[{keyword}] 상품 ID: {product['id']}, 제목: {product['title']}")
+        except Exception as e:
+            logging.error(f"[{keyword}] 크롤링 도중 예외 발생: {e}")
+            traceback.print_exc()
+        finally:
+            await context.close()
+
+    return product_data
+
+
+async def scrape_keywords_async(keywords, concurrency=SCRAPE_CONCURRENCY, block_resources=True, limit=PRODUCT_LIMIT,
+                                mode=None):
+    """여러 키워드를 동시에 크롤링해 {키워드: [(상품 ID, 상품 제목)]}을 반환합니다."""
+    mode = mode or CAPTURE_MODE
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    async with async_playwright() as p:
+        logging.info(f"Playwright 브라우저 실행 (비동기, 동시 처리 {concurrency}개)")
+        browser = await p.chromium.launch(headless=True)
+        try:
+            results = await asyncio.gather(*[_scrape_keyword(browser, keyword, semaphore, block_resources, limit, mode)
+                                             for keyword in keywords])
+        finally:
+            await browser.close()
+    return dict(zip(keywords, results))
+
+
+def scrape_keywords(keywords, concurrency=SCRAPE_CONCURRENCY, block_resources=True, limit=PRODUCT_LIMIT, mode=None):
+    return asyncio.run(scrape_keywords_async(keywords, concurrency, block_resources, limit, mode))
@@ -0,0 +1,120 @@
+"""OpenAI Batch API(/files, /batches)를 흉내 내는 로컬 테스트용 서버입니다.
+
+실행: python batch_stub_server.py [포트]
+그 다음 OPENAI_API_BASE=http://127.0.0.1:8787/v1 OPENAI_BATCH=1 로 scrape_reviews.py / buying_guide.py를 실행합니다.
+배치는 생성 즉시 완료되며, 각 요청에는 고정된 응답을 돌려줍니다.
+"""
+import sys
+import json
+import time
+import uuid
+import logging
+import threading
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+_files = {}
+_batches = {}
+_lock = threading.Lock()
+
+
+def _stub_reply(body):
+    """요청 프롬프트에 맞는 고정 응답을 만듭니다 (요약 요청에는 review_content1/2 JSON)."""
+    prompt = body['messages'][-1]['content']
+    if 'review_content1' in prompt:
+        return json.dumps({
+            "review_content1": "가볍고 튼튼한 실속형 제품",
+            "review_content2": "배송이 빠르고 포장이 꼼꼼해서 만족스러웠습니다. 가격 대비 품질이 좋아 재구매 의사가 있어요."
+        }, ensure_ascii=False)
+    return f"[stub] {prompt[:40]}"
+
+
+def _run_batch(input_file_id):
+    output = []
+    for line in _files[input_file_id].decode('utf-8').splitlines():
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        completion = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request['body'].get('model'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": _stub_reply(request['body'])},
+                         "finish_reason": "stop"}],
+        }
+        output.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request['custom_id'],
+                       "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": completion},
+                       "error": None})
+    return "\n".join(json.dumps(item, ensure_ascii=False) for item in output).encode('utf-8'), len(output)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _send(self, status, payload, content_type='application/json'):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        if path.endswith('/files'):
+            # multipart/form-data에서 file 파트만 꺼내 저장
+            message = BytesParser(policy=policy.default).parsebytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('utf-8') + self._body())
+            for part in message.iter_parts():
+                if part.get_param('name', header='content-disposition') == 'file':
+                    file_id = f"file-{uuid.uuid4().hex[:12]}"
+                    with _lock:
+                        _files[file_id] = part.get_payload(decode=True)
+                    return self._send(200, {"id": file_id, "object": "file", "purpose": "batch"})
+            return self._send(400, {"error": {"message": "file 파트가 없습니다."}})
+
+        if path.endswith('/batches'):
+            request = json.loads(self._body())
+            if request.get('input_file_id') not in _files:
+                return self._send(404, {"error": {"message": "input_file_id를 찾을 수 없습니다."}})
+            output, total = _run_batch(request['input_file_id'])
+            batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+            output_file_id = f"file-{uuid.uuid4().hex[:12]}"
+            with _lock:
+                _files[output_file_id] = output
+                _batches[batch_id] = {
+                    "id": batch_id, "object": "batch", "endpoint": request.get('endpoint'),
+                    "input_file_id": request['input_file_id'], "status": "completed",
+                    "output_file_id": output_file_id, "error_file_id": None,
+                    "request_counts": {"total": total, "completed": total, "failed": 0},
+                }
+            logging.info(f"배치 {batch_id} 처리 완료 ({total}개 요청)")
+            return self._send(200, _batches[batch_id])
+
+        self._send(404, {"error": {"message": f"알 수 없는 경로: {path}"}})
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].rstrip('/').split('/')
+        if len(parts) >= 2 and parts[-2] == 'batches' and parts[-1] in _batches:
+            return self._send(200, _batches[parts[-1]])
+        if len(parts) >= 3 and parts[-1] == 'content' and parts[-3] == 'files' and parts[-2] in _files:
+            return self._send(200, _files[parts[-2]], 'application/jsonl')
+        self._send(404, {"error": {"message": f"알 수 없는 경로: {self.path}"}})
+
+    def log_message(self, format, *args):
+        logging.info(format % args)
+
+
+def serve(port=8787):
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    logging.info(f"Batch API 테스트 서버 실행: http://127.0.0.1:{port}/v1")
+    return server
+
+
+if __name__ == '__main__':
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8787).serve_forever()
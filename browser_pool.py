@@ -0,0 +1,151 @@
+import os
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from resource_blocking import install_resource_blocking
+
+# 한 번에 빌려 둘 수 있는 최대 페이지 수(중첩 대여 포함) / 컨텍스트 재활용 주기 (환경 변수로 조정 가능)
+MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "2"))
+CONTEXT_MAX_USES = int(os.getenv("BROWSER_CONTEXT_MAX_USES", "20"))
+
+
+class BrowserPool:
+    """Chromium 하나를 띄워 두고 컨텍스트/페이지를 키워드별로 빌려 쓰는 풀입니다.
+
+    Playwright sync API 객체는 만든 스레드에서만 쓸 수 있으므로 풀도 처음 사용한 스레드 전용입니다.
+    다른 스레드에서 사용하면 RuntimeError를 냅니다 (여러 페이지를 동시에 돌리려면 async_search_scraper 사용).
+
+    - 컨텍스트는 context_max_uses번 사용하면 닫고 새로 만듭니다 (쿠키/메모리 누적 방지).
+    - 한 번에 빌려 둘 수 있는 페이지 수는 max_pages로 제한하며, 넘으면 기다리지 않고 RuntimeError를 냅니다.
+    - 브라우저 연결이 끊기면 다음 대여 시 다시 실행합니다.
+    - block_resources가 켜져 있으면 이미지/폰트/스타일/분석 요청을 차단합니다 (resource_blocking 참고).
+    """
+
+    def __init__(self, max_pages=MAX_PAGES, context_max_uses=CONTEXT_MAX_USES, headless=True, locale='ko-KR',
+                 block_resources=True, allowlist=None):
+        self.max_pages = max(1, int(max_pages))
+        self.context_max_uses = max(1, int(context_max_uses))
+        self.headless = headless
+        self.locale = locale
+        self.block_resources = block_resources
+        self.allowlist = allowlist
+        self._playwright = None
+        self._browser = None
+        self._idle = []   # (context, 사용 횟수) 목록
+        self._leased = 0  # 현재 빌려 준 페이지 수
+        self._owner = None  # 풀을 사용하는 스레드 id
+
+    def _check_thread(self):
+        if self._owner is None:
+            self._owner = threading.get_ident()
+        elif self._owner != threading.get_ident():
+            raise RuntimeError("BrowserPool은 처음 사용한 스레드에서만 쓸 수 있습니다 (Playwright sync API는 스레드 간 공유 불가).")
+
+    def is_healthy(self):
+        return self._browser is not None and self._browser.is_connected()
+
+    def _ensure_browser(self):
+        if self.is_healthy():
+            return
+        if self._browser is not None:
+            logging.warning("브라우저 연결이 끊어져 다시 실행합니다.")
+            self._shutdown()
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        logging.info("Playwright 브라우저 실행 (풀)")
+        self._browser = self._playwright.chromium.launch(headless=self.headless)
+
+    def _new_context(self):
+        context = self._browser.new_context(locale=self.locale)
+        if self.block_resources:
+            install_resource_blocking(context, self.allowlist)
+        return context
+
+    def _checkout_context(self):
+        self._ensure_browser()
+        if self._idle:
+            return self._idle.pop()
+        return self._new_context(), 0
+
+    def _checkin_context(self, context, uses, broken=False):
+        if broken or uses >= self.context_max_uses or not self.is_healthy():
+            try:
+                context.close()
+            except Exception:
+                pass
+            return
+        self._idle.append((context, uses))
+
+    @contextmanager
+    def page(self):
+        """풀에서 페이지 하나를 빌려 줍니다. with 블록이 끝나면 반납됩니다."""
+        self._check_thread()
+        if self._leased >= self.max_pages:
+            raise RuntimeError(f"BrowserPool 페이지 대여 한도({self.max_pages}) 초과")
+        self._leased += 1
+        try:
+            context, uses = self._checkout_context()
+        except Exception:
+            self._leased -= 1
+            raise
+        page = None
+        broken = False
+        try:
+            page = context.new_page()
+            yield page
+        except Exception:
+            broken = True  # 페이지 생성/사용 중 실패한 컨텍스트는 재사용하지 않고 닫음
+            raise
+        finally:
+            if page is not None:
+                try:
+                    page.close()
+                except Exception:
+                    broken = True
+            self._checkin_context(context, uses + 1, broken)
+            self._leased -= 1
+
+    def _shutdown(self):
+        for context, _ in self._idle:
+            try:
+                context.close()
+            except Exception:
+                pass
+        self._idle = []
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+
+    def close(self):
+        self._check_thread()
+        self._shutdown()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+        self._owner = None
+
+
+_default_pool = None
+
+
+def get_browser_pool():
+    """프로세스 전체에서 공유하는 기본 풀을 반환합니다."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = BrowserPool()
+        atexit.register(close_browser_pool)
+    return _default_pool
+
+
+def close_browser_pool():
+    global _default_pool
+    if _default_pool is not None:
+        _default_pool.close()
+        _default_pool = None
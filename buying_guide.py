@@ -1,9 +1,16 @@
-import gspread
-from google.oauth2.service_account import Credentials
 import openai
 import logging
 from datetime import datetime
 import os
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from sheets_client import get_worksheet
+from sheet_writer import BatchedSheetWriter
+from llm_cache import cached_chat_completion
+from sheet_partition import read_date_block
+from openai_batch import OPENAI_BATCH_ENABLED, run_batch
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(asctime)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
@@ -17,13 +24,16 @@ RESULT_SHEET_NAME = 'result'  # 결과 저장 시트; 열: [date, keyword, produ
 # OpenAI API 키 설정
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+# 구매 가이드 항목 (시트 C, D, E열 순서)
+SECTIONS = ("제품 선택 포인트", "구매 전 체크리스트", "자주 묻는 질문")
+# 동시에 보낼 GPT 요청 수 / 속도 제한(429) 응답 시 재시도 횟수
+GUIDE_CONCURRENCY = int(os.getenv("GUIDE_CONCURRENCY", "4"))
+GUIDE_RATE_LIMIT_RETRIES = int(os.getenv("GUIDE_RATE_LIMIT_RETRIES", "3"))
+
 # 구글 시트 연결 함수
 def connect_to_google_sheet(sheet_name):
     try:
-        scopes = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        creds = Credentials.from_service_account_file(JSON_KEY_PATH, scopes=scopes)
-        client = gspread.authorize(creds)
-        sheet = client.open_by_key(SHEET_ID).worksheet(sheet_name)
+        sheet = get_worksheet(sheet_name, SHEET_ID, JSON_KEY_PATH)
         logging.info(f'Google Sheet "{sheet_name}" 연결 성공')
         return sheet
     except Exception as e:
@@ -34,32 +44,45 @@ def connect_to_google_sheet(sheet_name):
 def get_keywords_from_google_sheet():
     try:
         sheet = connect_to_google_sheet('list')  # list 시트에서 키워드 가져오기
-        data = sheet.get_all_records()
         today = datetime.today().strftime('%Y-%m-%d')
-        keywords = [row['keyword'] for row in data if row.get('date') == today]
+        keywords = [row['keyword'] for _, row in read_date_block(sheet, today)]  # 오늘 날짜 행만 조회
         logging.info(f"오늘 날짜({today}) 키워드 수집 완료: {keywords}")
         return keywords
     except Exception as e:
         logging.error(f"키워드 수집 실패: {e}")
         return []
 
+# 항목별 구매 가이드 프롬프트
+def section_prompt(keyword, section):
+    prompt = f"당신은 매우 경험이 풍부한 블로거입니다. 아래와 같은 정보들을 바탕으로 {keyword}에 대한 {section}을 작성해주세요.\n\n"
+
+    if section == "제품 선택 포인트":
+        prompt += "1. 제품 선택 포인트: 이 품목을 선택할 때 고려항 중요한 사항을 300자 내외로 자세히 설명해 주세요."
+    elif section == "구매 전 체크리스트":
+        prompt += "2. 구매 전 체크리스트: 구매 전 확인해야 할 중요한 구체적인 항목을 5개 항목으로 설명해 주세요. 주요 확인 사항과 주의할 점을 강조해주세요."
+    elif section == "자주 묻는 질문":
+        prompt += "3. 자주 묻는 질문: 이 상품을 구매하기 전에 자주 묻는 질문에 대해 3개 질문과 답변으로 답해 주세요. 가장 일반적인 궁금증을 포함시켜 주세요."
+    return prompt
+
 # GPT로 항목별 구매 가이드 생성 함수
 def generate_section_guide(keyword, section):
     try:
-        prompt = f"당신은 매우 경험이 풍부한 블로거입니다. 아래와 같은 정보들을 바탕으로 {keyword}에 대한 {section}을 작성해주세요.\n\n"
-
-        if section == "제품 선택 포인트":
-            prompt += "1. 제품 선택 포인트: 이 품목을 선택할 때 고려항 중요한 사항을 300자 내외로 자세히 설명해 주세요."
-        elif section == "구매 전 체크리스트":
-            prompt += "2. 구매 전 체크리스트: 구매 전 확인해야 할 중요한 구체적인 항목을 5개 항목으로 설명해 주세요. 주요 확인 사항과 주의할 점을 강조해주세요."
-        elif section == "자주 묻는 질문":
-            prompt += "3. 자주 묻는 질문: 이 상품을 구매하기 전에 자주 묻는 질문에 대해 3개 질문과 답변으로 답해 주세요. 가장 일반적인 궁금증을 포함시켜 주세요."
-
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
+        prompt = section_prompt(keyword, section)
+
+        for attempt in range(GUIDE_RATE_LIMIT_RETRIES + 1):
+            try:
+                response = cached_chat_completion(
+                    model="gpt-4",
+                    messages=[{"role": "user", "content": prompt}]
+                )
+                break
+            except openai.error.RateLimitError:
+                if attempt == GUIDE_RATE_LIMIT_RETRIES:
+                    raise
+                delay = 2 ** attempt + random.uniform(0, 1)  # 지수 백오프 + 무작위 지연
+                logging.warning(f"[{keyword}] {section} 요청 속도 제한, {delay:.1f}초 후 재시도")
+                time.sleep(delay)
+
         guide = response['choices'][0]['message']['content']
         logging.info(f"{section} 응답 내용: {guide}")
         return guide.strip()
@@ -67,22 +90,62 @@ def generate_section_guide(keyword, section):
         logging.error(f"{section} 생성 오류: {e}")
         return ""
 
+# 모든 키워드의 항목별 가이드를 제한된 스레드 풀로 동시에 생성하는 함수
+def generate_guides(keywords, concurrency=GUIDE_CONCURRENCY):
+    """{키워드: [항목별 가이드]}를 반환합니다. 가이드 순서는 SECTIONS와 같습니다."""
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        futures = {
+            keyword: [executor.submit(generate_section_guide, keyword, section) for section in SECTIONS]
+            for keyword in keywords
+        }
+        guides = {keyword: [future.result() for future in section_futures]
+                  for keyword, section_futures in futures.items()}
+    logging.info(f"구매 가이드 동시 생성 완료: {len(guides)}개 키워드")
+    return guides
+
+# 모든 키워드의 항목별 가이드를 OpenAI Batch 작업 하나로 생성하는 함수 (OPENAI_BATCH=1)
+def generate_guides_batch(keywords):
+    """generate_guides와 같은 형식을 반환합니다. 배치에서 실패한 항목은 동기 호출로 다시 생성합니다."""
+    requests_by_id = {
+        f"guide-{i}-{j}": {"model": "gpt-4", "messages": [{"role": "user", "content": section_prompt(keyword, section)}]}
+        for i, keyword in enumerate(keywords)
+        for j, section in enumerate(SECTIONS)
+    }
+    replies = run_batch(requests_by_id)
+    guides = {}
+    for i, keyword in enumerate(keywords):
+        guides[keyword] = []
+        for j, section in enumerate(SECTIONS):
+            guide = replies[f"guide-{i}-{j}"]
+            if guide is None:
+                guide = generate_section_guide(keyword, section)
+            guides[keyword].append(guide)
+    logging.info(f"구매 가이드 배치 생성 완료: {len(guides)}개 키워드")
+    return guides
+
 # 구글 시트에 결과 저장하는 함수
 def save_results_to_sheet(results):
     try:
         sheet = connect_to_google_sheet('list')  # 'list' 시트에서 키워드 옆 C, D, E열에 결과 입력
-        for row in results:
-            keyword = row[1]
-            selection_points = row[2]
-            checklist = row[3]
-            faq = row[4]
-
-            cell = sheet.find(keyword)  # 키워드 위치 찾기
-            if cell:
-                logging.info(f"Keyword '{keyword}' 찾기 시도")
-                sheet.update_cell(cell.row, 3, selection_points)  # C열에 제품 선택 포인트 저장
-                sheet.update_cell(cell.row, 4, checklist)  # D열에 구매 전 체크리스트 저장
-                sheet.update_cell(cell.row, 5, faq)  # E열에 자주 묻는 질문 저장
+
+        # 키워드 위치는 B열을 한 번만 읽어서 찾기 (키워드마다 find 호출하지 않음)
+        keyword_rows = {}
+        for row_number, value in enumerate(sheet.col_values(2), start=1):
+            keyword_rows.setdefault(value, row_number)
+
+        with BatchedSheetWriter(sheet) as writer:
+            for row in results:
+                keyword = row[1]
+                selection_points = row[2]
+                checklist = row[3]
+                faq = row[4]
+
+                row_number = keyword_rows.get(keyword)  # 키워드 위치 찾기
+                if row_number:
+                    logging.info(f"Keyword '{keyword}' 찾기 시도")
+                    writer.update_cell(row_number, 3, selection_points)  # C열에 제품 선택 포인트 저장
+                    writer.update_cell(row_number, 4, checklist)  # D열에 구매 전 체크리스트 저장
+                    writer.update_cell(row_number, 5, faq)  # E열에 자주 묻는 질문 저장
 
         logging.info("구매 가이드 결과가 구글 시트에 성공적으로 저장되었습니다.")
     except Exception as e:
@@ -98,17 +161,21 @@ def main():
 
     results = []
     today = datetime.today().strftime('%Y-%m-%d')
-    
+
+    # 키워드 x 항목 요청을 한꺼번에 동시 처리한 뒤 결과를 모아 한 번에 저장
+    guides = None
+    if OPENAI_BATCH_ENABLED:
+        try:
+            guides = generate_guides_batch(keywords)
+        except Exception as e:
+            # 배치 제출/대기 실패(오류 응답, OPENAI_BATCH_MAX_WAIT 초과 등) 시 동기 호출로 생성
+            logging.error(f"배치 가이드 생성 실패, 동기 호출로 대체합니다: {e}")
+    if guides is None:
+        guides = generate_guides(keywords)
     for keyword in keywords:
-        logging.info(f"[PROCESS] '{keyword}' 작업 시작")
-        
-        # 각 항목별로 GPT로 요청하고 결과 저장
-        selection_points = generate_section_guide(keyword, "제품 선택 포인트")
-        checklist = generate_section_guide(keyword, "구매 전 체크리스트")
-        faq = generate_section_guide(keyword, "자주 묻는 질문")
-        
+        selection_points, checklist, faq = guides[keyword]
         results.append([today, keyword, selection_points, checklist, faq])  # 각 항목의 결과 저장
-    
+
     if results:
         save_results_to_sheet(results)  # 결과를 Google Sheets에 저장
     else:
@@ -0,0 +1,13 @@
+import os
+import sqlite3
+
+# 로컬 캐시(SQLite) 파일을 두는 디렉터리
+CACHE_DIR = os.getenv("PICKVIEW_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+
+def open_cache_db(filename):
+    """CACHE_DIR 아래의 SQLite 파일을 엽니다. 여러 스레드에서 공유하므로 호출하는 쪽에서 락으로 보호해야 합니다."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    db = sqlite3.connect(os.path.join(CACHE_DIR, filename), check_same_thread=False, timeout=30)
+    db.execute('PRAGMA journal_mode=WAL')
+    return db
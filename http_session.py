@@ -0,0 +1,58 @@
+import os
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 커넥션 풀 / 재시도 설정 (환경 변수로 조정 가능)
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))   # 호스트별 풀 개수
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))           # 풀당 최대 연결 수
+RETRY_TOTAL = int(os.getenv("HTTP_RETRY_TOTAL", "4"))
+RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))      # 0.5, 1, 2, 4초 ...
+RETRY_JITTER = float(os.getenv("HTTP_RETRY_JITTER", "0.5"))        # 백오프에 더하는 최대 무작위 지연(초)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+class JitterRetry(Retry):
+    """지수 백오프에 무작위 지연을 더하는 Retry. Retry-After 헤더가 있으면 그 값을 우선합니다."""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, RETRY_JITTER)
+
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, retries=RETRY_TOTAL,
+                   backoff_factor=RETRY_BACKOFF):
+    """keep-alive 커넥션 풀과 429/5xx 재시도가 설정된 requests.Session을 만듭니다.
+
+    재시도는 GET 등 멱등 메서드에만 적용되고, 재시도가 끝나도 실패하면 마지막 응답을 그대로 반환합니다.
+    """
+    retry = JitterRetry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_lock = threading.Lock()
+_session = None
+
+
+def get_session():
+    """프로세스 전체에서 공유하는 세션을 반환합니다 (커넥션 재사용)."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = create_session()
+        return _session
@@ -0,0 +1,55 @@
+import os
+import time
+import threading
+
+from cache_store import open_cache_db
+
+# 제휴 링크를 다시 만들지 않고 재사용하는 기간 (일 단위)
+LINK_CACHE_TTL = float(os.getenv("AFFILIATE_LINK_TTL_DAYS", "30")) * 86400
+
+
+class LinkCache:
+    """(product_id, tracking_id)별 제휴 링크(promotion_link)를 저장하는 SQLite 캐시입니다."""
+
+    def __init__(self, filename='links.sqlite3', ttl=LINK_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = open_cache_db(filename)
+        with self._lock, self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS links ('
+                ' product_id TEXT NOT NULL, tracking_id TEXT NOT NULL, promotion_link TEXT NOT NULL,'
+                ' created_at REAL NOT NULL, PRIMARY KEY (product_id, tracking_id))'
+            )
+
+    def get_many(self, product_ids, tracking_id):
+        """TTL 이내인 링크만 {상품 ID: promotion_link}로 반환합니다."""
+        product_ids = [str(product_id) for product_id in product_ids]
+        if not product_ids:
+            return {}
+        placeholders = ','.join('?' * len(product_ids))
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT product_id, promotion_link FROM links'
+                f' WHERE tracking_id = ? AND created_at >= ? AND product_id IN ({placeholders})',
+                [tracking_id, time.time() - self.ttl] + product_ids
+            ).fetchall()
+        return dict(rows)
+
+    def put_many(self, links, tracking_id):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?)',
+                                 [(str(product_id), tracking_id, link, now) for product_id, link in links.items()])
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_link_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LinkCache()
+        return _cache
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+import openai
+
+from cache_store import open_cache_db
+from http_session import get_session
+from rate_limiter import acquire_openai
+
+# LLM 응답 캐시 설정: 사용 여부 / 최대 용량(MB, 넘으면 가장 오래 안 쓴 항목부터 삭제)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+# 응답 내용에 영향을 주지 않는 요청 인자 (캐시 키에서 제외)
+_NON_SEMANTIC_PARAMS = {'timeout', 'request_timeout', 'api_key', 'api_base', 'organization', 'stream'}
+
+
+def cache_key(request):
+    """(model, prompt, 파라미터)를 정규화한 JSON의 SHA-256 해시를 캐시 키로 사용합니다."""
+    semantic = {k: v for k, v in request.items() if k not in _NON_SEMANTIC_PARAMS}
+    canonical = json.dumps(semantic, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """OpenAI 응답을 요청 내용 해시로 저장하는 SQLite 캐시 (용량 기준 LRU 삭제)."""
+
+    def __init__(self, filename='llm.sqlite3', max_bytes=LLM_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = open_cache_db(filename)
+        with self._lock, self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL, size INTEGER NOT NULL,'
+                ' created_at REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)')
+
+    def get(self, key):
+        with self._lock, self._db:
+            row = self._db.execute('SELECT response FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE responses SET last_access = ? WHERE key = ?', (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, model, response):
+        payload = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                             (key, model, payload, len(payload.encode('utf-8')), now, now))
+            self._evict()
+
+    def _evict(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 가장 오래 사용하지 않은 항목부터 용량 한도 아래로 내려갈 때까지 삭제
+        for key, size in self._db.execute('SELECT key, size FROM responses ORDER BY last_access').fetchall():
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def get_or_call(self, request, call, validate=None, refresh=False):
+        """request에 대한 캐시가 있으면 반환하고, 없으면 call()을 호출해 결과를 저장합니다.
+
+        call()이 None을 반환하면 (요청 실패) 저장하지 않습니다.
+        validate(응답)가 False인 응답은 캐시에서 꺼내 쓰지도, 저장하지도 않으며
+        refresh=True면 캐시를 조회하지 않고 새로 요청합니다 (통과한 응답은 저장).
+        """
+        key = cache_key(request)
+        if not refresh:
+            cached = self.get(key)
+            if cached is not None and (validate is None or validate(cached)):
+                logging.info(f"LLM 응답 캐시 사용 ({request.get('model')}, {key[:12]})")
+                return cached
+        response = call()
+        if response is not None and (validate is None or validate(response)):
+            self.put(key, request.get('model'), response)
+        return response
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def cached_chat_completion(validate=None, refresh=False, **kwargs):
+    """openai.ChatCompletion.create와 같은 인자로 호출하며, 같은 요청은 캐시된 응답(dict)을 반환합니다.
+
+    validate / refresh는 LLMCache.get_or_call과 같습니다 (조건에 맞지 않는 응답은 캐시하지 않음).
+    """
+    def call():
+        acquire_openai(kwargs)  # 캐시에 없어 실제로 요청할 때만 분당 요청/토큰 한도 확보
+        return openai.ChatCompletion.create(**kwargs)
+
+    if not LLM_CACHE_ENABLED:
+        return call()
+    # OpenAIObject는 dict이므로 JSON으로 저장했다가 같은 방식(['choices'][0]...)으로 꺼내 쓸 수 있음
+    return get_llm_cache().get_or_call(kwargs, lambda: json.loads(json.dumps(call())), validate, refresh)
+
+
+def cached_chat_completion_http(headers, data, url=OPENAI_CHAT_URL, validate=None, refresh=False):
+    """openai 패키지 없이 chat completions 엔드포인트에 직접 POST하는 버전입니다. 요청이 실패하면 None을 반환합니다."""
+    def call():
+        acquire_openai(data)
+        response = get_session().post(url, headers=headers, json=data)
+        if response.status_code != 200:
+            logging.error(f"OpenAI API 요청 중 오류 발생: {response.status_code}")
+            return None
+        return response.json()
+
+    if not LLM_CACHE_ENABLED:
+        return call()
+    return get_llm_cache().get_or_call(data, call, validate, refresh)
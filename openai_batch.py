@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import logging
+
+from http_session import get_session
+from llm_cache import cache_key, get_llm_cache, LLM_CACHE_ENABLED
+
+# 배치 모드 사용 여부 (OPENAI_BATCH=1이면 요약/가이드 요청을 한 번의 Batch 작업으로 제출)
+OPENAI_BATCH_ENABLED = os.getenv("OPENAI_BATCH", "0") == "1"
+# API 주소 (로컬 테스트 시 batch_stub_server.py 주소로 바꿔서 사용, 예: http://127.0.0.1:8787/v1)
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1").rstrip('/')
+CHAT_ENDPOINT = "/v1/chat/completions"
+# 상태 확인 간격(초) / 최대 대기 시간(초, 기본 24시간) / 완료 기한
+BATCH_POLL_INTERVAL = float(os.getenv("OPENAI_BATCH_POLL_INTERVAL", "60"))
+BATCH_MAX_WAIT = float(os.getenv("OPENAI_BATCH_MAX_WAIT", str(24 * 3600)))
+BATCH_COMPLETION_WINDOW = "24h"
+
+_FINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def _headers():
+    return {"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', '')}"}
+
+
+def _check(response, action):
+    if response.status_code != 200:
+        raise RuntimeError(f"{action} 실패, 상태 코드: {response.status_code}, 내용: {response.text}")
+    return response
+
+
+def submit_batch(requests_by_id, api_base=OPENAI_API_BASE):
+    """{custom_id: chat completion 요청 본문}을 JSONL 파일로 올리고 Batch 작업을 만들어 batch id를 반환합니다."""
+    lines = [
+        json.dumps({"custom_id": custom_id, "method": "POST", "url": CHAT_ENDPOINT, "body": body}, ensure_ascii=False)
+        for custom_id, body in requests_by_id.items()
+    ]
+    session = get_session()
+    uploaded = _check(session.post(
+        f"{api_base}/files",
+        headers=_headers(),
+        data={"purpose": "batch"},
+        files={"file": ("batch.jsonl", "\n".join(lines).encode('utf-8'), "application/jsonl")},
+        timeout=120
+    ), "배치 파일 업로드").json()
+
+    batch = _check(session.post(
+        f"{api_base}/batches",
+        headers=_headers(),
+        json={"input_file_id": uploaded['id'], "endpoint": CHAT_ENDPOINT, "completion_window": BATCH_COMPLETION_WINDOW},
+        timeout=30
+    ), "배치 생성").json()
+    logging.info(f"OpenAI 배치 제출 완료: {batch['id']} ({len(lines)}개 요청)")
+    return batch['id']
+
+
+def wait_for_batch(batch_id, api_base=OPENAI_API_BASE, poll_interval=BATCH_POLL_INTERVAL, max_wait=BATCH_MAX_WAIT):
+    """배치가 끝날 때까지(completed/failed/expired/cancelled) 상태를 확인하고 마지막 배치 정보를 반환합니다."""
+    deadline = time.time() + max_wait
+    while True:
+        batch = _check(get_session().get(f"{api_base}/batches/{batch_id}", headers=_headers(), timeout=30),
+                       "배치 상태 조회").json()
+        counts = batch.get('request_counts') or {}
+        logging.info(f"배치 {batch_id} 상태: {batch['status']} "
+                     f"(완료 {counts.get('completed', 0)}/{counts.get('total', 0)}, 실패 {counts.get('failed', 0)})")
+        if batch['status'] in _FINAL_STATUSES:
+            return batch
+        if time.time() >= deadline:
+            raise TimeoutError(f"배치 {batch_id}가 {max_wait:.0f}초 안에 끝나지 않았습니다.")
+        time.sleep(poll_interval)
+
+
+def download_results(batch, api_base=OPENAI_API_BASE):
+    """완료된 배치의 결과 파일을 읽어 {custom_id: chat completion 응답}을 반환합니다. 실패한 요청은 빠집니다."""
+    results = {}
+    if batch.get('error_file_id'):
+        logging.warning(f"배치 {batch['id']}에 실패한 요청이 있습니다 (error_file_id: {batch['error_file_id']})")
+    if not batch.get('output_file_id'):
+        return results
+
+    content = _check(get_session().get(f"{api_base}/files/{batch['output_file_id']}/content", headers=_headers(),
+                                       timeout=120), "배치 결과 다운로드").text
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get('response') or {}
+        if item.get('error') or response.get('status_code') != 200:
+            logging.error(f"[{item.get('custom_id')}] 배치 요청 실패: {item.get('error') or response.get('body')}")
+            continue
+        results[item['custom_id']] = response['body']
+    return results
+
+
+def run_batch(requests_by_id, api_base=OPENAI_API_BASE, poll_interval=BATCH_POLL_INTERVAL, max_wait=BATCH_MAX_WAIT,
+              validate=None):
+    """요청들을 한 번의 배치로 처리하고 {custom_id: 응답 텍스트}를 반환합니다 (실패한 요청은 None).
+
+    LLM 응답 캐시에 있는 요청은 제출하지 않고, 받은 결과는 캐시에 저장해 동기 호출과 같은 캐시를 씁니다.
+    validate(응답)가 False인 응답은 캐시에서 꺼내 쓰지도, 저장하지도 않습니다 (LLMCache.get_or_call과 같음).
+    """
+    cache = get_llm_cache() if LLM_CACHE_ENABLED else None
+    responses = {}
+    pending = {}
+    for custom_id, body in requests_by_id.items():
+        cached = cache.get(cache_key(body)) if cache else None
+        if cached is not None and (validate is None or validate(cached)):
+            responses[custom_id] = cached
+        else:
+            pending[custom_id] = body
+    logging.info(f"배치 요청 준비: 전체 {len(requests_by_id)}개 중 캐시 사용 {len(responses)}개, 제출 {len(pending)}개")
+
+    if pending:
+        batch_id = submit_batch(pending, api_base)
+        batch = wait_for_batch(batch_id, api_base, poll_interval, max_wait)
+        if batch['status'] != 'completed':
+            logging.error(f"배치 {batch_id}가 완료되지 않았습니다: {batch['status']}")
+        for custom_id, response in download_results(batch, api_base).items():
+            responses[custom_id] = response
+            if cache and custom_id in pending and (validate is None or validate(response)):
+                cache.put(cache_key(pending[custom_id]), pending[custom_id].get('model'), response)
+
+    return {
+        custom_id: (responses[custom_id]['choices'][0]['message']['content'].strip() if custom_id in responses else None)
+        for custom_id in requests_by_id
+    }
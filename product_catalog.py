@@ -0,0 +1,69 @@
+import os
+import json
+import time
+import threading
+
+from cache_store import open_cache_db
+
+# 필드 그룹별 캐시 유지 기간: 거의 바뀌지 않는 정보(제목/이미지 등)와 자주 바뀌는 정보(가격/할인율/판매량 등)
+CATALOG_STATIC_TTL = float(os.getenv("CATALOG_STATIC_TTL_DAYS", "7")) * 86400
+CATALOG_VOLATILE_TTL = float(os.getenv("CATALOG_VOLATILE_TTL_HOURS", "6")) * 3600
+
+STATIC_FIELDS = {'product_id', 'product_title', 'product_main_image_url', 'detail_url'}
+
+
+def field_ttl(field):
+    """STATIC_FIELDS 외의 필드(가격, 할인율, 판매량, 평점 등)는 모두 자주 바뀌는 필드로 취급합니다."""
+    return CATALOG_STATIC_TTL if field in STATIC_FIELDS else CATALOG_VOLATILE_TTL
+
+
+class ProductCatalog:
+    """상품 ID별 상세 정보를 필드 단위로 저장하고, 필드 그룹별 TTL로 오래된 필드를 알려 주는 SQLite 저장소입니다."""
+
+    def __init__(self, filename='catalog.sqlite3'):
+        self._lock = threading.Lock()
+        self._db = open_cache_db(filename)
+        with self._lock, self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS product_fields ('
+                ' product_id TEXT NOT NULL, field TEXT NOT NULL, value TEXT, updated_at REAL NOT NULL,'
+                ' PRIMARY KEY (product_id, field))'
+            )
+
+    def lookup(self, product_ids, fields):
+        """({상품 ID: {필드: 값}} 중 TTL 이내인 값, {상품 ID: [오래되었거나 없는 필드]})를 반환합니다."""
+        product_ids = [str(product_id) for product_id in product_ids]
+        fresh = {product_id: {} for product_id in product_ids}
+        if product_ids:
+            placeholders = ','.join('?' * len(product_ids))
+            with self._lock:
+                rows = self._db.execute(
+                    f'SELECT product_id, field, value, updated_at FROM product_fields WHERE product_id IN ({placeholders})',
+                    product_ids
+                ).fetchall()
+            now = time.time()
+            for product_id, field, value, updated_at in rows:
+                if field in fields and now - updated_at < field_ttl(field):
+                    fresh[product_id][field] = json.loads(value)
+        stale = {product_id: [field for field in fields if field not in values] for product_id, values in fresh.items()}
+        return fresh, {product_id: missing for product_id, missing in stale.items() if missing}
+
+    def put(self, details):
+        """{상품 ID: {필드: 값}}을 저장합니다. 응답에 있는 필드만 갱신 시각이 바뀝니다."""
+        now = time.time()
+        rows = [(str(product_id), field, json.dumps(value, ensure_ascii=False), now)
+                for product_id, detail in details.items() for field, value in detail.items()]
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO product_fields VALUES (?, ?, ?, ?)', rows)
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_product_catalog():
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = ProductCatalog()
+        return _catalog
@@ -1,5 +1,6 @@
 import os
-import requests
+from http_session import get_session
+from rate_limiter import get_limiter
 import hashlib
 import hmac
 import json
@@ -79,7 +80,8 @@ def fetch_product_details(keyword, limit=5):
         # 서명 생성
         params['sign'] = generate_signature(params, os.getenv("ALIEXPRESS_API_SECRET"))
 
-        response = requests.get("https://api.aliexpress.com/sync", params=params)
+        get_limiter('aliexpress').acquire()
+        response = get_session().get("https://api.aliexpress.com/sync", params=params)
         response.raise_for_status()
 
         data = response.json()
@@ -1,18 +1,18 @@
 # purchase_guide_creation.py
 
-import requests
+from llm_cache import cached_chat_completion_http
 import os
 
+
 def generate_purchase_guide(product_info, review_summary):
     api_key = os.getenv("OPENAI_API_KEY")  # 환경 변수에서 API 키 가져오기
     headers = {"Authorization": f"Bearer {api_key}"}
     prompt = f"Generate a purchase guide for {product_info['title']} based on the following reviews: {review_summary}"
     
-    response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json={"messages": [{"role": "user", "content": prompt}]})
-    if response.status_code == 200:
-        return response.json()['choices'][0]['message']['content']
+    result = cached_chat_completion_http(headers, {"messages": [{"role": "user", "content": prompt}]})
+    if result:
+        return result['choices'][0]['message']['content']
     else:
-        print(f"API 요청 중 오류 발생: {response.status_code}")
         return None
     
     # 구매 가이드 요청
@@ -30,13 +30,12 @@ def generate_purchase_guide(product_info, review_summary):
         "max_tokens": 150
     }
     
-    response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data)
+    result = cached_chat_completion_http(headers, data)
     
-    if response.status_code == 200:
-        guide = response.json()['choices'][0]['message']['content']
+    if result:
+        guide = result['choices'][0]['message']['content']
         return guide
     else:
-        print(f"OpenAI API 요청 중 오류 발생: {response.status_code}")
         return None
 
 # 사용 예시
@@ -0,0 +1,97 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+
+from token_count import count_tokens
+
+
+def _rate(name, default, per=1.0):
+    """환경 변수 값(기간 per초 동안 허용되는 요청 수)을 초당 비율로 바꿉니다."""
+    return float(os.getenv(name, default)) / per
+
+
+# 외부 서비스별 허용 속도 (환경 변수로 조정 가능)
+OPENAI_RPM = _rate("OPENAI_RPM", "500", 60)           # OpenAI 분당 요청 수
+OPENAI_TPM = _rate("OPENAI_TPM", "40000", 60)         # OpenAI 분당 토큰 수
+ALIEXPRESS_QPS = _rate("ALIEXPRESS_QPS", "5")         # AliExpress 제휴 API(/sync) 초당 요청 수
+SHEETS_WRITE_RPM = _rate("SHEETS_WRITE_RPM", "60", 60)  # Google Sheets 분당 쓰기 요청 수
+FEEDBACK_QPS = _rate("FEEDBACK_QPS", "5")             # 리뷰(feedback) API 초당 요청 수
+SEARCH_RPM = _rate("SEARCH_RPM", "30", 60)            # AliExpress 검색 페이지 분당 요청 수
+# 응답 토큰 수를 알 수 없을 때(max_tokens 미지정) 한 요청의 응답 토큰 추정치
+OPENAI_DEFAULT_COMPLETION_TOKENS = int(os.getenv("OPENAI_DEFAULT_COMPLETION_TOKENS", "500"))
+# 쉬고 있던 버킷이 한 번에 몰아서 보낼 수 있는 양 (초 단위 분량)
+RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "1"))
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷입니다.
+
+    스레드와 asyncio 양쪽에서 함께 쓸 수 있도록 락 안에서는 토큰만 예약하고, 기다리는 것은 락 밖에서 합니다.
+    capacity보다 많은 토큰을 요청하면 버킷이 음수가 되고 그만큼 다음 요청이 더 기다립니다.
+    """
+
+    def __init__(self, rate, capacity=None, name=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate * RATE_LIMIT_BURST_SECONDS))
+        self.name = name
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """tokens개를 예약하고 사용 가능해질 때까지 기다려야 하는 시간(초)을 반환합니다."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens=1):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logging.debug(f"[{self.name}] 속도 제한으로 {delay:.2f}초 대기")
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens=1):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            logging.debug(f"[{self.name}] 속도 제한으로 {delay:.2f}초 대기")
+            await asyncio.sleep(delay)
+
+
+_LIMITS = {
+    'openai_requests': OPENAI_RPM,
+    'openai_tokens': OPENAI_TPM,
+    'aliexpress': ALIEXPRESS_QPS,
+    'sheets_write': SHEETS_WRITE_RPM,
+    'feedback': FEEDBACK_QPS,
+    'search': SEARCH_RPM,
+}
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_limiter(name):
+    """프로세스 전체에서 공유하는 서비스별 토큰 버킷을 반환합니다."""
+    with _buckets_lock:
+        if name not in _buckets:
+            _buckets[name] = TokenBucket(_LIMITS[name], name=name)
+        return _buckets[name]
+
+
+def estimate_request_tokens(request):
+    """chat completion 요청의 프롬프트 토큰 수 + 응답 토큰 수(max_tokens 또는 기본 추정치)."""
+    prompt = sum(count_tokens(str(message.get('content', ''))) for message in request.get('messages', []))
+    return prompt + int(request.get('max_tokens') or OPENAI_DEFAULT_COMPLETION_TOKENS)
+
+
+def acquire_openai(request):
+    """OpenAI 요청 1건에 대해 분당 요청 수/토큰 수 한도를 함께 확보합니다."""
+    get_limiter('openai_requests').acquire()
+    get_limiter('openai_tokens').acquire(estimate_request_tokens(request))
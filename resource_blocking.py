@@ -0,0 +1,57 @@
+import os
+from urllib.parse import urlparse
+
+# 검색 결과에서 링크/제목만 읽으므로 렌더링용 리소스는 받지 않음
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet'}
+
+# 제3자 분석/광고 도메인 (리소스 종류와 관계없이 차단)
+TRACKER_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googleadservices.com',
+    'doubleclick.net',
+    'facebook.net',
+    'facebook.com',
+    'criteo.com',
+    'criteo.net',
+    'mmstat.com',
+    'arms-retcode.aliyuncs.com',
+)
+
+# 차단하지 않을 URL 조각 (쉼표 구분, 예: "alicdn.com/fonts,ae01.alicdn.com")
+ALLOWLIST = [item.strip() for item in os.getenv("RESOURCE_ALLOWLIST", "").split(',') if item.strip()]
+
+
+def _is_tracker(url):
+    host = urlparse(url).hostname or ''
+    return any(host == tracker or host.endswith('.' + tracker) for tracker in TRACKER_HOSTS)
+
+
+def should_block(resource_type, url, allowlist=None):
+    """요청을 차단할지 판단합니다. allowlist에 포함된 URL은 항상 통과시킵니다."""
+    allowlist = ALLOWLIST if allowlist is None else allowlist
+    if any(item in url for item in allowlist):
+        return False
+    return resource_type in BLOCKED_RESOURCE_TYPES or _is_tracker(url)
+
+
+def install_resource_blocking(context, allowlist=None):
+    """Playwright(동기) 컨텍스트의 모든 요청을 가로채 불필요한 리소스를 차단합니다."""
+    def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url, allowlist):
+            route.abort()
+        else:
+            route.continue_()
+    context.route('**/*', handle)
+
+
+async def install_resource_blocking_async(context, allowlist=None):
+    """install_resource_blocking의 비동기(playwright.async_api) 버전입니다."""
+    async def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url, allowlist):
+            await route.abort()
+        else:
+            await route.continue_()
+    await context.route('**/*', handle)
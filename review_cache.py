@@ -0,0 +1,71 @@
+import os
+import json
+import time
+import threading
+
+from cache_store import open_cache_db
+
+# 캐시된 리뷰를 그대로 쓰는 기간 (시간 단위, 환경 변수로 조정 가능)
+REVIEW_CACHE_TTL = float(os.getenv("REVIEW_CACHE_TTL_HOURS", "72")) * 3600
+
+
+class ReviewCache:
+    """리뷰 API 응답(evaViewList)을 (product_id, lang, page, page_size) 단위로 저장하는 SQLite 캐시입니다."""
+
+    def __init__(self, filename='reviews.sqlite3', ttl=REVIEW_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = open_cache_db(filename)
+        with self._lock, self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS reviews ('
+                ' product_id TEXT NOT NULL, lang TEXT NOT NULL, page INTEGER NOT NULL, page_size INTEGER NOT NULL,'
+                ' payload TEXT NOT NULL, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL,'
+                ' PRIMARY KEY (product_id, lang, page, page_size))'
+            )
+
+    def get(self, product_id, lang, page, page_size):
+        """저장된 항목을 dict로 반환합니다 (없으면 None). fresh 값으로 TTL 이내인지 알려 줍니다."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT payload, etag, last_modified, fetched_at FROM reviews'
+                ' WHERE product_id = ? AND lang = ? AND page = ? AND page_size = ?',
+                (str(product_id), lang, page, page_size)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, etag, last_modified, fetched_at = row
+        return {
+            'reviews': json.loads(payload),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': time.time() - fetched_at < self.ttl,
+        }
+
+    def put(self, product_id, lang, page, page_size, reviews, etag=None, last_modified=None):
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (str(product_id), lang, page, page_size, json.dumps(reviews, ensure_ascii=False), etag, last_modified,
+                 time.time())
+            )
+
+    def touch(self, product_id, lang, page, page_size):
+        """서버가 304(변경 없음)를 돌려준 경우 저장 시각만 갱신합니다."""
+        with self._lock, self._db:
+            self._db.execute(
+                'UPDATE reviews SET fetched_at = ? WHERE product_id = ? AND lang = ? AND page = ? AND page_size = ?',
+                (time.time(), str(product_id), lang, page, page_size)
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_review_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReviewCache()
+        return _cache
@@ -1,6 +1,6 @@
 # review_crawling_and_summarization.py
 
-import requests
+from llm_cache import cached_chat_completion_http
 from playwright.sync_api import sync_playwright
 import os
 
@@ -32,13 +32,12 @@ def summarize_reviews(reviews):
         "max_tokens": 100
     }
     
-    response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data)
-    
-    if response.status_code == 200:
-        summary = response.json()['choices'][0]['message']['content']
+    # 같은 요청은 LLM 응답 캐시에서 반환 (실패한 응답은 캐시하지 않음)
+    result = cached_chat_completion_http(headers, data)
+    if result:
+        summary = result['choices'][0]['message']['content']
         return summary
     else:
-        print(f"OpenAI API 요청 중 오류 발생: {response.status_code}")
         return None
 
 # 사용 예시
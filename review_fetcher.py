@@ -0,0 +1,172 @@
+import os
+import asyncio
+import logging
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+from http_session import get_session
+from rate_limiter import get_limiter
+from review_cache import get_review_cache
+
+REVIEW_URL = "https://feedback.aliexpress.com/pc/searchEvaluation.do"
+REVIEW_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+    "Accept": "application/json"
+}
+
+# 동시에 요청할 상품 수 (feedback 호스트 요청 속도는 rate_limiter의 FEEDBACK_QPS로 제한)
+REVIEW_CONCURRENCY = int(os.getenv("REVIEW_CONCURRENCY", "8"))
+
+# 페이지 단위 수집 설정: 상품당 목표 리뷰 수 / 페이지 크기 / 최대 페이지 수
+REVIEW_TARGET = int(os.getenv("REVIEW_TARGET", "10"))
+REVIEW_PAGE_SIZE = int(os.getenv("REVIEW_PAGE_SIZE", "10"))
+REVIEW_MAX_PAGES = int(os.getenv("REVIEW_MAX_PAGES", "3"))
+
+
+def fetch_review_page(product_id, page=1, page_size=10, lang='ko_KR', use_cache=True):
+    """리뷰 API 한 페이지를 요청해 evaViewList를 반환합니다. 실패하면 None을 반환합니다.
+
+    로컬 리뷰 캐시를 먼저 확인하고, TTL이 지난 항목은 ETag/Last-Modified로 조건부 요청해 갱신합니다.
+    요청이 실패했거나 응답에 evaViewList가 없으면 캐시는 그대로 두고, TTL이 지난 캐시라도 있으면 그 리뷰를 반환합니다.
+    """
+    cache = get_review_cache() if use_cache else None
+    cached = cache.get(product_id, lang, page, page_size) if cache else None
+    if cached and cached['fresh']:
+        return cached['reviews']
+
+    headers = dict(REVIEW_HEADERS)
+    if cached and cached['etag']:
+        headers['If-None-Match'] = cached['etag']
+    if cached and cached['last_modified']:
+        headers['If-Modified-Since'] = cached['last_modified']
+
+    params = {
+        "productId": product_id,
+        "lang": lang,
+        "country": "KR",
+        "page": page,
+        "pageSize": page_size,
+        "filter": 5,
+        "sort": "complex_default",
+    }
+    # 요청이 실패하면 TTL이 지났더라도 캐시된 리뷰를 대신 사용
+    stale = cached['reviews'] if cached else None
+    get_limiter('feedback').acquire()  # 캐시를 못 쓰고 실제로 요청할 때만 속도 제한
+    try:
+        response = get_session().get(REVIEW_URL, params=params, headers=headers, timeout=30)
+    except requests.RequestException as e:
+        if stale is None:
+            raise
+        logging.warning(f"[{product_id}] 리뷰 데이터 요청 실패, 캐시된 리뷰 사용: {e}")
+        return stale
+    if response.status_code == 304 and cached:
+        cache.touch(product_id, lang, page, page_size)  # 변경 없음: 캐시 그대로 사용
+        return cached['reviews']
+    if response.status_code != 200:
+        logging.error(f"[{product_id}] 리뷰 데이터 요청 실패, 상태 코드: {response.status_code}, 내용: {response.text}")
+        return stale
+
+    # JSON 형식 확인
+    if 'application/json' not in response.headers.get('Content-Type', ''):
+        logging.error(f"[{product_id}] JSON 형식이 아닙니다: {response.text}")
+        return stale
+
+    try:
+        data = response.json().get('data')
+    except (ValueError, AttributeError):
+        data = None
+    if not isinstance(data, dict) or 'evaViewList' not in data:
+        # 요청 제한/봇 차단 응답 등: 빈 목록을 캐시하면 TTL 동안 리뷰를 다시 받지 않으므로 저장하지 않음
+        logging.warning(f"[{product_id}] 응답에 evaViewList가 없습니다: {response.text[:200]}")
+        return stale if stale is not None else []
+
+    reviews = data['evaViewList'] or []
+    if cache:
+        cache.put(product_id, lang, page, page_size, reviews,
+                  response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return reviews
+
+
+def extract_translated_reviews(reviews):
+    """buyerTranslationFeedback이 있는 리뷰만 골라 텍스트 목록으로 반환합니다."""
+    return [review.get('buyerTranslationFeedback') for review in reviews if review.get('buyerTranslationFeedback')]
+
+
+def iter_translated_reviews(product_id, target=REVIEW_TARGET, page_size=REVIEW_PAGE_SIZE, max_pages=REVIEW_MAX_PAGES,
+                            prefetch=True):
+    """번역 리뷰를 target개 모일 때까지 필요한 페이지만 차례로 요청하며 하나씩 내보내는 제너레이터입니다.
+
+    prefetch가 켜져 있으면 현재 페이지를 처리하는 동안 다음 페이지를 미리 요청해 둡니다.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+    def load(page):
+        if executor is None:
+            future = Future()
+            future.set_result(fetch_review_page(product_id, page, page_size))
+            return future
+        return executor.submit(fetch_review_page, product_id, page, page_size)
+
+    found = 0
+    pending = load(1)
+    try:
+        for page in range(1, max_pages + 1):
+            reviews = pending.result()
+            pending = None
+            if not reviews:
+                return
+            texts = extract_translated_reviews(reviews)
+            last_page = len(reviews) < page_size or page >= max_pages
+
+            # 이 페이지로 목표를 못 채우면 다음 페이지를 미리 요청
+            if not last_page and found + len(texts) < target:
+                pending = load(page + 1)
+
+            for text in texts:
+                yield text
+                found += 1
+                if found >= target:
+                    return
+            if pending is None:
+                return
+    finally:
+        if executor is not None:
+            if pending is not None:
+                pending.cancel()
+            executor.shutdown(wait=False)
+
+
+def fetch_translated_reviews(product_id, target=REVIEW_TARGET, prefetch=True):
+    return list(iter_translated_reviews(product_id, target, prefetch=prefetch))
+
+
+async def fetch_reviews_async(product_ids, concurrency=REVIEW_CONCURRENCY):
+    """여러 상품의 리뷰를 동시에 가져와 {상품 ID: [리뷰 텍스트]}를 반환합니다.
+
+    동시 요청 수는 concurrency로 제한하고, 페이지 요청마다 feedback 토큰 버킷에서 속도 제한을 받습니다.
+    상품별 다음 페이지 미리 요청(prefetch)은 끄고 상품 하나당 요청 하나만 진행해 동시 요청 수가 concurrency를 넘지 않게 합니다.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+
+    with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+        async def fetch_one(product_id):
+            async with semaphore:
+                try:
+                    return await loop.run_in_executor(executor, fetch_translated_reviews, product_id, REVIEW_TARGET, False)
+                except Exception as e:
+                    logging.error(f"[{product_id}] 리뷰 크롤링 도중 예외 발생: {e}")
+                    traceback.print_exc()
+                    return []
+
+        results = await asyncio.gather(*[fetch_one(product_id) for product_id in product_ids])
+
+    reviews_by_id = dict(zip(product_ids, results))
+    logging.info(f"리뷰 동시 수집 완료: {len(reviews_by_id)}개 상품")
+    return reviews_by_id
+
+
+def fetch_reviews_concurrently(product_ids, concurrency=REVIEW_CONCURRENCY):
+    return asyncio.run(fetch_reviews_async(product_ids, concurrency))
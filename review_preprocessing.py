@@ -0,0 +1,78 @@
+import os
+import re
+import logging
+import unicodedata
+
+from token_count import count_tokens, truncate_to_tokens
+
+# 요약 요청에 넣을 리뷰 텍스트의 최대 토큰 수 (0 이하이면 제한 없음)
+REVIEW_TOKEN_BUDGET = int(os.getenv("REVIEW_TOKEN_BUDGET", "1500"))
+# 이 값 이상으로 겹치는 리뷰는 중복으로 보고 하나만 남김 (글자 3-gram 자카드 유사도)
+REVIEW_DUPLICATE_THRESHOLD = float(os.getenv("REVIEW_DUPLICATE_THRESHOLD", "0.8"))
+# 이보다 짧은 리뷰(글자 수)나 한 단어짜리 리뷰는 제외
+REVIEW_MIN_CHARS = 5
+
+
+def normalize_review(text):
+    """유니코드 정규화, 공백 정리, 같은 문자의 과도한 반복(ㅋㅋㅋㅋ, !!!!) 축약."""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = re.sub(r'(.)\1{3,}', r'\1\1\1', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def is_informative(text):
+    return len(text) >= REVIEW_MIN_CHARS and len(text.split()) >= 2
+
+
+def _shingles(text, n=3):
+    compact = re.sub(r'\W+', '', text.lower())
+    return {compact[i:i + n] for i in range(max(1, len(compact) - n + 1))}
+
+
+def remove_near_duplicates(reviews, threshold=REVIEW_DUPLICATE_THRESHOLD):
+    """앞에 나온 리뷰와 거의 같은 리뷰를 제거합니다 (순서 유지)."""
+    kept = []
+    for review in reviews:
+        shingles = _shingles(review)
+        if all(len(shingles & other) / len(shingles | other) < threshold for _, other in kept):
+            kept.append((review, shingles))
+    return [review for review, _ in kept]
+
+
+def informativeness(text):
+    """서로 다른 단어 수가 많을수록, 숫자(크기/기간 등 구체적 정보)가 있을수록 높은 점수."""
+    words = set(re.findall(r'\w+', text.lower()))
+    return len(words) + (2 if re.search(r'\d', text) else 0)
+
+
+def pack_reviews(reviews, budget=REVIEW_TOKEN_BUDGET):
+    """순서대로 리뷰를 담되 줄바꿈 포함 토큰 수가 budget을 넘는 리뷰는 건너뜁니다.
+
+    하나도 담지 못하면 (모든 리뷰가 예산보다 길면) 첫 번째 리뷰를 예산에 맞게 잘라서 담습니다.
+    """
+    if budget <= 0:
+        return list(reviews)
+    packed, used = [], 0
+    for review in reviews:
+        cost = count_tokens(review) + 1
+        if used + cost > budget:
+            continue
+        packed.append(review)
+        used += cost
+    if not packed and reviews:
+        truncated = truncate_to_tokens(reviews[0], budget - 1).strip()
+        if truncated:
+            packed.append(truncated)
+    return packed
+
+
+def prepare_reviews(reviews, budget=REVIEW_TOKEN_BUDGET):
+    """요약 요청 전에 리뷰를 정규화 → 짧은 리뷰 제외 → 중복 제거 → 정보량 순 정렬 → 토큰 예산만큼 담기."""
+    normalized = [text for text in (normalize_review(review) for review in reviews) if text]
+    candidates = [text for text in normalized if is_informative(text)] or normalized  # 전부 짧으면 그대로 사용
+    candidates = remove_near_duplicates(candidates)
+    candidates.sort(key=informativeness, reverse=True)
+    packed = pack_reviews(candidates, budget)
+    if len(packed) != len(reviews):
+        logging.info(f"리뷰 전처리: {len(reviews)}개 → {len(packed)}개 (토큰 예산 {budget})")
+    return packed
@@ -0,0 +1,158 @@
+import os
+import re
+import json
+import logging
+import traceback
+
+from llm_cache import cached_chat_completion
+from review_preprocessing import prepare_reviews
+
+SUMMARY_MODEL = "gpt-4"
+
+# 요약 방식: 'single'(한 번의 호출로 두 문구를 JSON으로 받음) 또는 'two_step'(기존 방식, 두 번 호출)
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "single")
+# 글자 수 조건을 못 맞춘 항목만 다시 요청하는 최대 횟수
+SUMMARY_MAX_RETRIES = int(os.getenv("SUMMARY_MAX_RETRIES", "1"))
+
+# 글자 수 조건: review_content1은 10-20자, review_content2는 문장당 15-40자의 1~2개 문장
+COPY_LENGTH = (10, 20)
+BENEFIT_SENTENCE_LENGTH = (15, 40)
+BENEFIT_MAX_SENTENCES = 2
+
+
+def copy_prompt(reviews_text, product_title):
+    return f"다음 상품 제목과 리뷰를 바탕으로 이 상품의 가장 핵심적인 장점을 10-20자 이내로 간결하게 표현하는 카피라이팅 문구를 작성해 주세요. 리뷰 내용: {reviews_text}. 상품 제목: {product_title}"
+
+
+def benefit_prompt(reviews_text, product_title, review_content1):
+    return f"다음 상품 제목과 리뷰를 바탕으로, '{review_content1}'에서 다루지 않은 추가적인 장점을 문장당 15-40자 이내의 1~2개 문장으로 작성해 주세요. 리뷰 내용: {reviews_text}. 상품 제목: {product_title}"
+
+
+def combined_prompt(reviews_text, product_title):
+    return (
+        "다음 상품 제목과 리뷰를 바탕으로 두 가지 문구를 작성해 주세요.\n"
+        "1. review_content1: 이 상품의 가장 핵심적인 장점을 10-20자 이내로 간결하게 표현하는 카피라이팅 문구\n"
+        "2. review_content2: review_content1에서 다루지 않은 추가적인 장점을 문장당 15-40자 이내의 1~2개 문장으로\n"
+        '다른 설명 없이 {"review_content1": "...", "review_content2": "..."} 형식의 JSON으로만 답해 주세요.\n'
+        f"리뷰 내용: {reviews_text}. 상품 제목: {product_title}"
+    )
+
+
+def retry_prompt(prompt, rejected):
+    """조건에 맞지 않은 이전 답변과 글자 수를 덧붙여 다시 묻는 프롬프트 (캐시 키도 달라짐)."""
+    return f"{prompt}\n이전 답변 '{rejected}'은(는) {len(rejected)}자로 글자 수 조건에 맞지 않습니다. 조건에 맞게 다시 작성해 주세요."
+
+
+def summary_request(reviews, product_title):
+    """single 모드 요약 요청 본문 (배치 제출용, 동기 호출과 같은 캐시 키를 가짐)."""
+    return {"model": SUMMARY_MODEL,
+            "messages": [{"role": "user", "content": combined_prompt("\n".join(prepare_reviews(reviews)), product_title)}]}
+
+
+def _content(response):
+    return response['choices'][0]['message']['content'].strip()
+
+
+def _ask(prompt, check=None):
+    # check(답변)를 통과한 답변만 캐시에 저장 (조건에 맞지 않는 답변이 캐시에 남아 재요청 때 다시 나오지 않도록)
+    response = cached_chat_completion(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        validate=(lambda response: check(_content(response))) if check else None,
+        timeout=30
+    )
+    return _content(response)
+
+
+def parse_combined(content):
+    """single 모드 응답에서 JSON을 꺼냅니다. 코드 블록(```json)으로 감싼 경우도 처리합니다."""
+    match = re.search(r'\{.*\}', content, re.DOTALL)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return str(data.get('review_content1', '')).strip(), str(data.get('review_content2', '')).strip()
+
+
+def is_valid_copy(text):
+    return COPY_LENGTH[0] <= len(text) <= COPY_LENGTH[1]
+
+
+def is_valid_benefits(text):
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?。])\s*', text) if s.strip()]
+    return (1 <= len(sentences) <= BENEFIT_MAX_SENTENCES and
+            all(BENEFIT_SENTENCE_LENGTH[0] <= len(s) <= BENEFIT_SENTENCE_LENGTH[1] for s in sentences))
+
+
+def is_valid_reply(reply):
+    parsed = parse_combined(reply)
+    return parsed is not None and is_valid_copy(parsed[0]) and is_valid_benefits(parsed[1])
+
+
+def is_valid_summary_response(response):
+    """single 모드 응답(dict)이 두 항목 모두 글자 수 조건을 만족하는지 확인합니다 (배치 결과 캐시 검증용)."""
+    return is_valid_reply(_content(response))
+
+
+def _summarize_single(reviews_text, product_title, reply=None):
+    if reply is None:
+        reply = _ask(combined_prompt(reviews_text, product_title), is_valid_reply)
+    parsed = parse_combined(reply)
+    if parsed is None:
+        logging.warning("요약 JSON 파싱 실패, 항목별로 다시 요청합니다.")
+        parsed = ('', '')
+    review_content1, review_content2 = parsed
+
+    # 조건을 못 맞춘 항목만 다시 요청 (나머지 항목은 그대로 사용, 이전 답변이 있으면 함께 알려 줌)
+    for _ in range(SUMMARY_MAX_RETRIES):
+        if not is_valid_copy(review_content1):
+            prompt = copy_prompt(reviews_text, product_title)
+            review_content1 = _ask(retry_prompt(prompt, review_content1) if review_content1 else prompt, is_valid_copy)
+        if not is_valid_benefits(review_content2):
+            prompt = benefit_prompt(reviews_text, product_title, review_content1)
+            review_content2 = _ask(retry_prompt(prompt, review_content2) if review_content2 else prompt, is_valid_benefits)
+    if review_content1 and review_content2 and (not is_valid_copy(review_content1) or not is_valid_benefits(review_content2)):
+        logging.warning(f"글자 수 조건을 만족하지 못한 요약: {review_content1} / {review_content2}")
+    return review_content1, review_content2
+
+
+def _summarize_two_step(reviews_text, product_title):
+    # review_content1: 10-20자 이내로 간결한 카피라이팅 문구 작성
+    review_content1 = _ask(copy_prompt(reviews_text, product_title), is_valid_copy)
+    # review_content2: 상품의 추가적인 긍정적인 특징을 15-40자 이내로 자연스럽게 작성
+    review_content2 = _ask(benefit_prompt(reviews_text, product_title, review_content1), is_valid_benefits)
+    return review_content1, review_content2
+
+
+def summarize_reviews(reviews, product_title, mode=None, reply=None):
+    """리뷰 목록으로 (review_content1, review_content2)를 만듭니다. 실패하면 None을 반환합니다.
+
+    reply에 summary_request의 응답(배치 결과 등)을 넘기면 첫 요청을 생략하고 검증/재요청만 합니다.
+    """
+    mode = mode or SUMMARY_MODE
+    try:
+        reviews_text = "\n".join(prepare_reviews(reviews))  # 정규화/중복 제거 후 토큰 예산만큼만 사용
+        if not reviews_text:
+            logging.warning(f"[{product_title}] 요약할 리뷰 내용이 없습니다.")
+            return None
+        if reply is not None:
+            result = _summarize_single(reviews_text, product_title, reply)
+        elif mode == 'single':
+            result = _summarize_single(reviews_text, product_title)
+        else:
+            result = _summarize_two_step(reviews_text, product_title)
+        review_content1, review_content2 = result
+        logging.info(f"상품 제목: {product_title}, 카피라이팅 문구: {review_content1}")
+
+        # 리뷰 추출 또는 요약 실패시 None 반환
+        if len(review_content1) == 0 or len(review_content2) == 0:
+            return None
+        return review_content1, review_content2
+    except Exception as e:
+        logging.error(f"GPT 요약 중 오류 발생: {e}")
+        traceback.print_exc()
+        return None
@@ -0,0 +1,205 @@
+import os
+import time
+import logging
+import traceback
+
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+from browser_pool import get_browser_pool
+from rate_limiter import get_limiter
+
+SEARCH_URL = 'https://www.aliexpress.com/wholesale?SearchText={keyword}&SortType=total_tranpro_desc'
+PRODUCT_LINK_SELECTOR = 'a[href*="/item/"]'
+
+# 키워드당 가져올 상위 상품 수
+PRODUCT_LIMIT = int(os.getenv("SCRAPE_PRODUCT_LIMIT", "5"))
+
+# 수집 방식: 'dom'(렌더링된 링크에서 추출) 또는 'json'(검색 XHR 응답을 가로채 파싱, 못 받으면 dom으로 대체)
+CAPTURE_MODE = os.getenv("SCRAPE_CAPTURE_MODE", "dom")
+JSON_CAPTURE_TIMEOUT_MS = int(os.getenv("SCRAPE_JSON_TIMEOUT_MS", "5000"))
+# 검색 결과 목록을 내려주는 XHR 주소 조각
+SEARCH_RESPONSE_PATTERNS = ('/fn/search-pc/', '/glosearch/api/')
+
+# 상품 목록 대기 설정: 전체 제한 시간 / 스크롤 후 새 상품이 붙기를 기다리는 시간 (ms)
+PRODUCT_WAIT_TIMEOUT_MS = 15000
+SCROLL_SETTLE_TIMEOUT_MS = 2000
+
+# 상품 링크(href)에서 상품 ID를 뽑는 JS 식 (parse_product_id와 동일한 규칙)
+_JS_PRODUCT_ID = "((a.getAttribute('href') || '').split('/item/')[1] || '').split('.')[0]"
+
+# 화면에 나온 서로 다른 상품 ID 수
+COUNT_JS = f"elements => new Set(elements.map(a => {_JS_PRODUCT_ID}).filter(Boolean)).size"
+# 선택자에 걸리는 서로 다른 상품 ID 수가 n보다 많아졌는지 확인하는 스크립트
+COUNT_GREW_JS = (f"([selector, n]) => new Set(Array.from(document.querySelectorAll(selector), a => {_JS_PRODUCT_ID})"
+                 f".filter(Boolean)).size > n")
+
+# 상품 링크들을 한 번의 evaluate로 읽어 상품 ID 기준 중복 제거한 레코드 목록을 반환하는 스크립트.
+# 같은 상품의 이미지 링크/제목 링크가 따로 있으므로 비어 있는 필드는 뒤 링크의 값으로 채움.
+EXTRACT_PRODUCTS_JS = f"""(elements, limit) => {{
+    const byId = new Map();
+    for (const a of elements) {{
+        const id = {_JS_PRODUCT_ID};
+        if (!id) continue;
+        const lines = (a.innerText || '').split('\\n').map(line => line.trim()).filter(Boolean);
+        const record = {{
+            id: id,
+            title: lines.length ? lines[0] : '',
+            price: lines.find(line => /[₩$€]|원|KRW/.test(line) && /\\d/.test(line)) || '',
+            rating: lines.find(line => /^[0-5](\\.\\d)?$/.test(line)) || '',
+            sold: lines.find(line => /판매|sold/i.test(line)) || '',
+        }};
+        const seen = byId.get(id);
+        if (!seen) {{
+            if (byId.size >= limit * 3) break;
+            byId.set(id, record);
+        }} else {{
+            for (const key of Object.keys(record)) {{
+                if (!seen[key] && record[key]) seen[key] = record[key];
+            }}
+        }}
+    }}
+    return Array.from(byId.values()).filter(record => record.title).slice(0, limit);
+}}"""
+
+
+def parse_product_id(href):
+    """상품 링크(href)에서 상품 ID를 추출합니다."""
+    if not href or '/item/' not in href:
+        return None
+    return href.split('/item/')[1].split('.')[0]
+
+
+def is_search_response(response):
+    """page.on("response") / expect_response에서 검색 결과 JSON 응답인지 판별합니다."""
+    return response.ok and any(pattern in response.url for pattern in SEARCH_RESPONSE_PATTERNS)
+
+
+def _dig(item, *paths):
+    # 'a.b.c' 경로 중 처음으로 값이 있는 것을 반환
+    for path in paths:
+        value = item
+        for key in path.split('.'):
+            value = value.get(key) if isinstance(value, dict) else None
+        if value not in (None, '', {}):
+            return value
+    return ''
+
+
+def _find_items(payload):
+    # 응답 구조가 바뀌어도 productId를 가진 dict 목록을 찾아냄
+    if isinstance(payload, list):
+        if any(isinstance(item, dict) and 'productId' in item for item in payload):
+            return [item for item in payload if isinstance(item, dict) and 'productId' in item]
+        payload = {str(i): item for i, item in enumerate(payload)}
+    if isinstance(payload, dict):
+        for value in payload.values():
+            items = _find_items(value)
+            if items:
+                return items
+    return []
+
+
+def parse_search_payload(payload, limit=PRODUCT_LIMIT):
+    """검색 XHR 응답(JSON)을 DOM 추출과 같은 {id, title, price, rating, sold} 레코드 목록으로 바꿉니다."""
+    products = []
+    seen = set()
+    for item in _find_items(payload):
+        product_id = str(item.get('productId') or '')
+        title = _dig(item, 'title.displayTitle', 'title.seoTitle', 'title')
+        if not product_id or product_id in seen or not isinstance(title, str) or not title:
+            continue
+        seen.add(product_id)
+        products.append({
+            'id': product_id,
+            'title': title.strip(),
+            'price': str(_dig(item, 'prices.salePrice.formattedPrice', 'prices.salePrice.minPrice')),
+            'rating': str(_dig(item, 'evaluation.starRating')),
+            'sold': str(_dig(item, 'trade.tradeDesc', 'trade.realTradeCount')),
+        })
+        if len(products) >= limit:
+            break
+    return products
+
+
+def wait_for_products(page, target, timeout_ms=PRODUCT_WAIT_TIMEOUT_MS):
+    """상품 링크가 target개 이상이 되거나, 스크롤해도 더 늘지 않을 때까지 기다립니다.
+
+    고정 sleep 대신 선택자 개수 변화를 신호로 사용하며, 찾은 링크 수를 반환합니다.
+    """
+    deadline = time.monotonic() + timeout_ms / 1000
+    try:
+        page.wait_for_selector(PRODUCT_LINK_SELECTOR, state='attached', timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        return 0
+
+    count = page.eval_on_selector_all(PRODUCT_LINK_SELECTOR, COUNT_JS)
+    while count < target:
+        remaining_ms = (deadline - time.monotonic()) * 1000
+        if remaining_ms <= 0:
+            break
+        page.evaluate('window.scrollBy(0, window.innerHeight);')
+        try:
+            page.wait_for_function(COUNT_GREW_JS, arg=[PRODUCT_LINK_SELECTOR, count],
+                                   timeout=min(SCROLL_SETTLE_TIMEOUT_MS, remaining_ms))
+        except PlaywrightTimeoutError:
+            break  # 스크롤해도 상품 수가 그대로면 더 기다리지 않음
+        count = page.eval_on_selector_all(PRODUCT_LINK_SELECTOR, COUNT_JS)
+    return count
+
+
+def _capture_search_json(page, url, keyword):
+    # 페이지 이동과 동시에 검색 XHR 응답을 기다림 (못 받으면 None)
+    try:
+        with page.expect_response(is_search_response, timeout=JSON_CAPTURE_TIMEOUT_MS) as response_info:
+            page.goto(url, wait_until='domcontentloaded')
+        return response_info.value.json()
+    except PlaywrightTimeoutError:
+        logging.info(f"[{keyword}] 검색 JSON 응답을 받지 못해 DOM 추출로 대체합니다.")
+    except ValueError:
+        logging.warning(f"[{keyword}] 검색 JSON 파싱 오류, DOM 추출로 대체합니다.")
+    except PlaywrightError as e:
+        # 응답 본문을 읽을 수 없는 경우 등 (예: "body unavailable")
+        logging.warning(f"[{keyword}] 검색 JSON 응답 읽기 실패 ({e}), DOM 추출로 대체합니다.")
+    return None
+
+
+def scrape_products(keyword, limit=PRODUCT_LIMIT, pool=None, mode=None):
+    """검색 결과 상위 limit개 상품의 {id, title, price, rating, sold} 레코드 목록을 반환합니다."""
+    mode = mode or CAPTURE_MODE
+    products = []
+
+    if not keyword:  # 키워드가 None일 경우 바로 종료
+        logging.warning("검색어가 비어 있습니다. 건너뜁니다.")
+        return products
+
+    get_limiter('search').acquire()  # 검색 페이지 요청 속도 제한 (키워드 사이 고정 대기 대신)
+    pool = pool or get_browser_pool()  # 브라우저는 키워드마다 새로 띄우지 않고 풀에서 페이지만 빌려 씀
+    try:
+        with pool.page() as page:
+            url = SEARCH_URL.format(keyword=keyword)
+            if mode == 'json':
+                # 검색 XHR 응답을 바로 파싱하면 스크롤/DOM 조회가 필요 없음
+                payload = _capture_search_json(page, url, keyword)
+                products = parse_search_payload(payload, limit) if payload is not None else []
+            else:
+                page.goto(url, wait_until='domcontentloaded')  # 페이지가 로드될 때까지 대기
+            logging.info(f"[{keyword}] 페이지 로딩 완료")
+
+            if not products:
+                # 상품이 limit개 이상 나타날 때까지 대기 (부족하면 스크롤하며 상품 수가 멈출 때까지)
+                wait_for_products(page, limit)
+
+                # 상품 ID/제목/가격 등을 한 번의 호출로 추출 (요소별 왕복 없음)
+                products = page.eval_on_selector_all(PRODUCT_LINK_SELECTOR, EXTRACT_PRODUCTS_JS, limit)
+            for product in products:
+                logging.info(f"[{keyword}] 상품 ID: {product['id']}, 제목: {product['title']}")
+    except Exception as e:
+        logging.error(f"[{keyword}] 크롤링 도중 예외 발생: {e}")
+        traceback.print_exc()
+
+    return products
+
+
+def scrape_product_ids_and_titles(keyword, pool=None, limit=PRODUCT_LIMIT, mode=None):
+    """검색 결과 상위 상품의 (상품 ID, 상품 제목) 튜플 목록을 반환합니다."""
+    return [(product['id'], product['title']) for product in scrape_products(keyword, limit, pool, mode)]
@@ -0,0 +1,84 @@
+import logging
+import threading
+
+from sheet_partition import read_date_block
+
+
+class ResultSheetIndex:
+    """result 시트 스냅샷을 (date, keyword) / product_id 기준으로 메모리에 색인합니다."""
+
+    def __init__(self, entries):
+        self.rows = []             # (행 번호, record) 목록
+        self._by_date = {}         # date -> [(행 번호, record)]
+        self._by_date_keyword = {}  # (date, keyword) -> [(행 번호, record)]
+        self._by_product_id = {}   # product_id -> 행 번호 (같은 ID가 여러 번 있으면 마지막 행)
+        for row_number, record in entries:
+            self.add(row_number, record)
+
+    def add(self, row_number, record):
+        date = str(record.get('date', ''))
+        keyword = str(record.get('keyword', '')).strip()
+        entry = (row_number, record)
+        self.rows.append(entry)
+        self._by_date.setdefault(date, []).append(entry)
+        self._by_date_keyword.setdefault((date, keyword), []).append(entry)
+        product_id = str(record.get('product_id', ''))
+        if product_id:
+            self._by_product_id[product_id] = row_number
+
+    def rows_for_date(self, date):
+        return self._by_date.get(str(date), [])
+
+    def rows_for(self, date, keyword):
+        return self._by_date_keyword.get((str(date), str(keyword).strip()), [])
+
+    def product_ids(self, date, keyword):
+        return [str(record['product_id']) for _, record in self.rows_for(date, keyword) if record.get('product_id')]
+
+    def row_of(self, product_id):
+        return self._by_product_id.get(str(product_id))
+
+    def __contains__(self, product_id):
+        return str(product_id) in self._by_product_id
+
+    def __len__(self):
+        return len(self.rows)
+
+
+# 실행 한 번에 시트별로 스냅샷 한 번만 가져오기
+_lock = threading.Lock()
+_indexes = {}  # (스프레드시트 id, 워크시트 id, date) -> ResultSheetIndex
+
+
+def _sheet_key(sheet):
+    # 워크시트 id(gid)는 스프레드시트마다 0부터 시작하므로 스프레드시트 id와 함께 사용
+    return (sheet.spreadsheet.id, sheet.id)
+
+
+def get_result_index(sheet, date=None, refresh=False):
+    """시트를 한 번만 읽어 색인을 만들고 이후에는 캐시된 색인을 반환합니다.
+
+    date를 주면 해당 날짜 블록만 읽고, 생략하면 시트 전체를 읽습니다.
+    """
+    with _lock:
+        key = _sheet_key(sheet) + (date,)
+        index = _indexes.get(key)
+        if index is None or refresh:
+            if date is None:
+                entries = enumerate(sheet.get_all_records(), start=2)
+            else:
+                entries = read_date_block(sheet, date)
+            index = ResultSheetIndex(entries)
+            _indexes[key] = index
+            logging.info(f'[{sheet.title}] 시트 스냅샷 색인 완료: {len(index)}행')
+        return index
+
+
+def invalidate(sheet=None):
+    """시트를 직접 수정한 뒤 다음 조회에서 스냅샷을 다시 가져오도록 합니다."""
+    with _lock:
+        if sheet is None:
+            _indexes.clear()
+        else:
+            for key in [key for key in _indexes if key[:2] == _sheet_key(sheet)]:
+                del _indexes[key]
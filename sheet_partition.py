@@ -0,0 +1,124 @@
+import os
+import json
+import logging
+import threading
+
+from gspread.utils import rowcol_to_a1
+
+# 시트별로 마지막으로 읽은 날짜 블록의 시작 행을 기억하는 파일
+CURSOR_PATH = os.getenv("SHEET_CURSOR_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sheet_cursors.json'))
+
+_lock = threading.Lock()
+_headers = {}  # (스프레드시트 id, 워크시트 id) -> 헤더 행
+
+
+def _load_cursors():
+    try:
+        with open(CURSOR_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cursor(key, date, row_number):
+    with _lock:
+        cursors = _load_cursors()
+        cursors[key] = {'date': date, 'row': row_number}
+        try:
+            with open(CURSOR_PATH, 'w', encoding='utf-8') as f:
+                json.dump(cursors, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logging.warning(f"시트 커서 저장 실패: {e}")
+
+
+def _cursor_key(sheet):
+    return f"{sheet.spreadsheet.id}:{sheet.title}"
+
+
+def get_headers(sheet):
+    key = (sheet.spreadsheet.id, sheet.id)
+    with _lock:
+        if key not in _headers:
+            _headers[key] = sheet.row_values(1)
+        return _headers[key]
+
+
+def _read_dates(sheet, date_col, from_row):
+    """date 열을 from_row행부터 시트 끝까지 한 번에 읽습니다 (반환값[i]는 from_row + i행, 빈 셀은 '')."""
+    col = rowcol_to_a1(1, date_col).rstrip('0123456789')
+    return [str(row[0]) if row else '' for row in sheet.get(f"{col}{from_row}:{col}")]
+
+
+def _cursor_start(sheet, date, date_col, cursor):
+    """기억한 행 바로 앞부터 date 열을 읽고, 그 행이 여전히 기억한 날짜 블록의 시작이면 (읽은 값, 시작 행)을 반환합니다.
+
+    행 삭제/정렬 등으로 어긋났으면 None을 반환합니다.
+    """
+    if not cursor or not cursor.get('date') or cursor['date'] > date or cursor.get('row', 0) < 2:
+        return None
+    first_row = max(2, cursor['row'] - 1)
+    dates = _read_dates(sheet, date_col, first_row)
+    offset = cursor['row'] - first_row
+    if len(dates) <= offset or dates[offset] != cursor['date']:
+        return None
+    if offset and not (dates[0] and dates[0] < cursor['date']):
+        return None
+    return dates, first_row
+
+
+def _find_block_start(dates, date, first_row):
+    """date 열이 추가 순서(오름차순)라는 가정으로 date 이상인 첫 행 번호를 찾습니다.
+
+    dates[i]는 first_row + i행의 값이며, 빈 셀은 어떤 날짜보다 크게 취급합니다.
+    """
+    lo, hi = 0, len(dates)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if dates[mid] and dates[mid] < date:
+            lo = mid + 1
+        else:
+            hi = mid
+    return first_row + lo
+
+
+def read_date_block(sheet, date, date_col_name='date'):
+    """date 열 값이 date인 연속된 행 블록만 A1 범위로 가져옵니다.
+
+    반환값은 (행 번호, record) 목록이며 record는 get_all_records와 같은 헤더 기준 dict입니다.
+    date 열은 이전 실행에서 기억한 블록 시작 행부터만 읽고, 커서가 없거나 어긋났으면 2행부터 전부 읽습니다.
+    """
+    headers = get_headers(sheet)
+    if date_col_name not in headers:
+        raise ValueError(f'"{sheet.title}" 시트에 {date_col_name} 열이 없습니다.')
+    date_idx = headers.index(date_col_name)
+    date = str(date)
+
+    cursor = _load_cursors().get(_cursor_key(sheet))
+    found = _cursor_start(sheet, date, date_idx + 1, cursor)
+    if found is None:
+        if cursor:
+            logging.info(f'[{sheet.title}] 시트 커서가 맞지 않아 date 열 전체를 읽습니다.')
+        found = _read_dates(sheet, date_idx + 1, 2), 2
+    dates, first_row = found
+
+    start = _find_block_start(dates, date, first_row)
+    end = start
+    while end - first_row < len(dates) and dates[end - first_row] == date:
+        end += 1  # end는 블록 다음 행
+
+    values = []
+    if end > start:
+        end_col = rowcol_to_a1(1, len(headers)).rstrip('0123456789')
+        values = sheet.get(f"{rowcol_to_a1(start, 1)}:{end_col}{end - 1}")
+
+    rows = []
+    for offset, values_row in enumerate(values):
+        values_row = list(values_row) + [''] * (len(headers) - len(values_row))
+        if str(values_row[date_idx]) != date:
+            break
+        rows.append((start + offset, dict(zip(headers, values_row))))
+
+    if rows:
+        _save_cursor(_cursor_key(sheet), date, start)
+    logging.info(f'[{sheet.title}] {date} 날짜 블록 {len(rows)}행 조회 (시작 행: {start}, date 열 {len(dates)}행 읽음)')
+    return rows
@@ -0,0 +1,63 @@
+import os
+import logging
+
+from gspread.utils import rowcol_to_a1
+
+from rate_limiter import get_limiter
+
+# 한 번에 전송할 최대 작업 수 (행 추가 + 셀 업데이트 합계), 환경 변수로 조정 가능
+DEFAULT_FLUSH_SIZE = int(os.getenv("SHEET_FLUSH_SIZE", "200"))
+
+
+class BatchedSheetWriter:
+    """append_row / update_cell 호출을 모아 append_rows / batch_update 요청으로 전송합니다."""
+
+    def __init__(self, sheet, flush_size=DEFAULT_FLUSH_SIZE):
+        self.sheet = sheet
+        self.flush_size = max(1, int(flush_size))
+        self._pending_rows = []     # append_rows로 보낼 행 목록
+        self._pending_cells = {}    # A1 주소 -> 값 (같은 셀은 마지막 값만 전송)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+
+    @property
+    def pending(self):
+        return len(self._pending_rows) + len(self._pending_cells)
+
+    def append_row(self, row):
+        self._pending_rows.append(list(row))
+        self._maybe_flush()
+
+    def append_rows(self, rows):
+        for row in rows:
+            self.append_row(row)
+
+    def update_cell(self, row, col, value):
+        self._pending_cells[rowcol_to_a1(row, col)] = value
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.pending >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        # 셀 업데이트를 먼저 보내야 방금 추가한 행의 행 번호가 바뀌지 않습니다.
+        if self._pending_cells:
+            data = [{'range': a1, 'values': [[value]]} for a1, value in self._pending_cells.items()]
+            # update_cell과 동일하게 USER_ENTERED로 입력
+            get_limiter('sheets_write').acquire()
+            self.sheet.batch_update(data, value_input_option='USER_ENTERED')
+            logging.info(f'[{self.sheet.title}] 셀 {len(data)}개 일괄 업데이트')
+            self._pending_cells = {}
+        if self._pending_rows:
+            rows = self._pending_rows
+            get_limiter('sheets_write').acquire()
+            self.sheet.append_rows(rows, value_input_option='RAW')
+            logging.info(f'[{self.sheet.title}] 행 {len(rows)}개 일괄 추가')
+            self._pending_rows = []
+
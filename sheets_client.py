@@ -0,0 +1,71 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import gspread
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+
+SCOPES = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+# 만료 몇 분 전에 토큰을 미리 갱신할지
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+
+# 프로세스 전체에서 공유하는 연결 상태
+_lock = threading.RLock()
+_clients = {}       # json_key_path -> (creds, gspread client)
+_spreadsheets = {}  # (json_key_path, sheet_id) -> Spreadsheet
+_worksheets = {}    # (json_key_path, sheet_id, sheet_name) -> Worksheet
+_auth_request = Request()  # 토큰 갱신용 HTTP 세션 (keep-alive 재사용)
+
+
+def _refresh_if_needed(creds):
+    # expiry는 UTC naive datetime
+    if creds.valid and creds.expiry and creds.expiry - TOKEN_REFRESH_MARGIN > datetime.utcnow():
+        return
+    creds.refresh(_auth_request)
+    logging.info("Google 액세스 토큰 갱신 완료")
+
+
+def get_client(json_key_path):
+    """서비스 계정으로 한 번만 인증한 gspread 클라이언트를 반환합니다."""
+    with _lock:
+        cached = _clients.get(json_key_path)
+        if cached is None:
+            logging.info("Google 서비스 계정 인증...")
+            creds = Credentials.from_service_account_file(json_key_path, scopes=SCOPES)
+            client = gspread.authorize(creds)
+            cached = _clients[json_key_path] = (creds, client)
+        creds, client = cached
+        _refresh_if_needed(creds)
+        return client
+
+
+def get_spreadsheet(sheet_id, json_key_path):
+    client = get_client(json_key_path)
+    with _lock:
+        key = (json_key_path, sheet_id)
+        if key not in _spreadsheets:
+            _spreadsheets[key] = client.open_by_key(sheet_id)
+        return _spreadsheets[key]
+
+
+def get_worksheet(sheet_name, sheet_id, json_key_path):
+    """워크시트 핸들을 이름별로 캐시해 반환합니다.
+
+    인증/시트 열기는 프로세스당 한 번만 수행하므로 각 스크립트의 connect_to_google_sheet는 매번 이 함수를 호출하면 됩니다.
+    """
+    spreadsheet = get_spreadsheet(sheet_id, json_key_path)
+    with _lock:
+        key = (json_key_path, sheet_id, sheet_name)
+        if key not in _worksheets:
+            _worksheets[key] = spreadsheet.worksheet(sheet_name)
+        return _worksheets[key]
+
+
+def reset():
+    """캐시된 연결을 모두 비웁니다 (시트 구조가 바뀐 경우 등)."""
+    with _lock:
+        _clients.clear()
+        _spreadsheets.clear()
+        _worksheets.clear()
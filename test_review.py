@@ -1,25 +1,15 @@
 import requests
 import logging
 
+from review_fetcher import fetch_review_page, extract_translated_reviews
+
 def get_reviews(product_id):
-    url = f"https://feedback.aliexpress.com/pc/searchEvaluation.do?productId={product_id}&lang=ko_KR&country=KR&page=1&pageSize=10&filter=5&sort=complex_default"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-        "Accept": "application/json"
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  # HTTP 오류 발생 시 예외 발생
-        
-        # JSON 형식 확인
-        if 'application/json' in response.headers.get('Content-Type', ''):
-            data = response.json()
-            reviews = data.get('data', {}).get('evaViewList', [])
-            return [review.get('buyerTranslationFeedback') for review in reviews if review.get('buyerTranslationFeedback')]
-        else:
-            logging.error(f"JSON 형식이 아닙니다: {response.text}")
+        # 로컬 리뷰 캐시를 거쳐 1페이지 조회 (요청 실패/JSON 형식 오류는 None)
+        reviews = fetch_review_page(product_id)
+        if reviews is None:
             return []
+        return extract_translated_reviews(reviews)
     except requests.exceptions.RequestException as e:
         logging.error(f"HTTP 요청 오류: {e}")
         return []
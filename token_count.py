@@ -0,0 +1,37 @@
+import logging
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken이 없으면 글자 수 기반 추정치를 사용
+    tiktoken = None
+
+_encoding = None  # 인코딩을 불러오지 못하면 False로 두고 이후에는 추정치만 사용
+
+
+def count_tokens(text, model="gpt-4"):
+    """tiktoken이 있으면 실제 토큰 수를, 없거나 실패하면 추정치(한글 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰)를 반환합니다."""
+    global _encoding
+    if tiktoken is not None and _encoding is not False:
+        try:
+            if _encoding is None:
+                _encoding = tiktoken.encoding_for_model(model)  # 인코딩 파일 다운로드 실패 등으로 예외가 날 수 있음
+            return len(_encoding.encode(text))
+        except Exception as e:
+            logging.warning(f"tiktoken 토큰 계산 실패, 글자 수 기반 추정치를 사용합니다: {e}")
+            _encoding = False
+    hangul = sum(1 for ch in text if '가' <= ch <= '힣')
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def truncate_to_tokens(text, budget, model="gpt-4"):
+    """count_tokens 기준으로 budget 토큰 이내가 되는 가장 긴 앞부분을 반환합니다."""
+    if count_tokens(text, model) <= budget:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid], model) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
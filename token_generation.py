@@ -1,6 +1,6 @@
 import hashlib
 import time
-import requests
+from http_session import get_session
 
 # App key, secret, and authorization code (hardcoded for now)
 app_key = "513774"  # 실제 app_key
@@ -41,7 +41,7 @@ params['sign'] = signature
 url = f"https://api-sg.aliexpress.com{api_path}?{'&'.join([f'{key}={value}' for key, value in params.items()])}"
 
 # Send the POST request
-response = requests.post(url, data=params)
+response = get_session().post(url, data=params)
 
 # Print the response status and content
 print(f"Response Status Code: {response.status_code}")
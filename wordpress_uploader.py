@@ -2,6 +2,8 @@
 
 import requests
 
+from http_session import get_session
+
 def upload_post_to_wordpress(title, content, wordpress_url, username, password):
     # WordPress REST API 엔드포인트
     api_url = f"{wordpress_url}/wp-json/wp/v2/posts"
@@ -18,7 +20,7 @@ def upload_post_to_wordpress(title, content, wordpress_url, username, password):
     
     try:
         # API 요청
-        response = requests.post(api_url, json=post_data, auth=credentials)
+        response = get_session().post(api_url, json=post_data, auth=credentials)
         response.raise_for_status()  # 요청이 성공하지 않으면 예외 발생
         
         print("포스트가 성공적으로 업로드되었습니다:", response.json())